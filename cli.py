@@ -1,33 +1,45 @@
 # cli.py
 import os
 import sys
+import atexit
+import logging
+import logging.handlers
+import queue
 import click
 from pathlib import Path
 from dotenv import load_dotenv
 
-# Ensure the 'src' directory is on the Python path to find the 'sec_analyzer' package.
-sys.path.append(os.path.abspath("src"))
+# Ensure the 'src' directory is on the Python path to find the 'sec_analyzer' package,
+# independent of the directory the CLI is launched from.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
 load_dotenv()
 
 # --- Imports from our sec_analyzer package ---
-from sec_analyzer import FilingsFetcher, FilingsExtractor, FilingParser
-from sec_analyzer.config import DEFAULT_FILINGS_DIRECTORY, DEFAULT_EXTRACTOR_OUTPUT_DIRECTORY
-from sec_analyzer.vector_db.model_loader import load_model_and_tokenizer
-from sec_analyzer.vector_db.chunking import (
-    process_csv_to_natural_language,
-    process_csv_to_raw_string,
-    process_csv_original_method,
-)
-from sec_analyzer.schemas import Filing
-from sec_analyzer.vector_db.embedding import insert_filing_with_embeddings
-from sec_analyzer.vector_db.search_service import vector_search_with_filter
-from pymongo import MongoClient
+# Only the lightweight config is imported here. The scrapers and the vector_db modules
+# (torch, transformers, pymongo) are imported inside the commands that use them, so that
+# e.g. `fetch` does not pay the model-stack import cost on every invocation.
+from sec_analyzer.config import DEFAULT_EXTRACTOR_OUTPUT_DIRECTORY, DEFAULT_FETCHER_MAX_WORKERS
+from sec_analyzer.utils import company_dir
 
 
 @click.group(help="A command-line tool to fetch, process, and query SEC filings.")
 def cli():
     """Main entry point for the SEC Analyzer CLI."""
-    pass
+    _configure_logging()
+
+
+def _configure_logging() -> None:
+    """Route log records through a queue so worker threads never block on stdout."""
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root_logger = logging.getLogger()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    root_logger.setLevel(logging.INFO)
 
 
 @cli.command()
@@ -35,25 +47,31 @@ def cli():
 @click.option("--cik", help="Company CIK number (e.g., 0000320193)")
 @click.option("--years", multiple=True, type=int, help="Years to fetch (e.g., --years 2023 --years 2022)")
 @click.option("--num-filings", default=4, type=int, show_default=True, help="Number of recent filings to get per year.")
-def fetch(ticker, cik, years, num_filings):
+@click.option("--workers", default=DEFAULT_FETCHER_MAX_WORKERS, type=click.IntRange(min=1), show_default=True,
+              help="Concurrent download threads (SEC allows ~10 requests/second).")
+def fetch(ticker, cik, years, num_filings, workers):
     """Fetch SEC 10-K filings and save them locally."""
     if not ticker and not cik:
         raise click.UsageError("Error: Must provide either --ticker or --cik.")
-    
-    fetcher = FilingsFetcher()
+
+    from sec_analyzer import FilingsFetcher
+
+    fetcher = FilingsFetcher(max_workers=workers)
     effective_cik = cik or fetcher.get_cik_from_ticker(ticker)
     if not effective_cik:
         click.echo(f"Could not determine CIK for ticker '{ticker}'. Aborting.", err=True)
         return
         
     click.echo(f"Starting to fetch filings for {ticker or 'CIK:'} ({effective_cik})...")
-    fetcher.get_filings(cik=effective_cik, ticker=ticker, years=list(years), num_filings=num_filings)
+    fetcher.get_filings(cik=effective_cik, ticker=ticker, years=frozenset(str(year) for year in years), num_filings=num_filings)
     click.echo("✅ Fetch complete.")
 
 @cli.command()
 @click.option("--ticker", required=True, help="Ticker symbol to process.")
 def extract(ticker):
     """Extract structured XBRL data from downloaded filings into CSV files."""
+    from sec_analyzer import FilingsExtractor
+
     try:
         extractor = FilingsExtractor()
         click.echo(f"Finding downloaded filings for {ticker}...")
@@ -76,9 +94,11 @@ def extract(ticker):
 @click.option("--ticker", required=True, help="Ticker symbol to process.")
 def parse(ticker):
     """Parse textual 'Item 8' data from downloaded filings into a single JSON file."""
+    from sec_analyzer import FilingParser
+
     try:
         parser = FilingParser()
-        filings_path = Path(DEFAULT_FILINGS_DIRECTORY) / ticker
+        filings_path = company_dir(ticker)
         output_file = Path(DEFAULT_EXTRACTOR_OUTPUT_DIRECTORY) / f"parsed_{ticker}.json"
 
         click.echo(f"Parsing text from filings in: {filings_path}")
@@ -94,9 +114,11 @@ def parse(ticker):
 @click.option("--ticker", required=True, help="Ticker symbol to process.")
 def parse_risk_factors(ticker):
     """Parse 'Item 1A: Risk Factors' from downloaded filings into a JSON file."""
+    from sec_analyzer import FilingParser
+
     try:
         parser = FilingParser()
-        filings_path = Path(DEFAULT_FILINGS_DIRECTORY) / ticker
+        filings_path = company_dir(ticker)
         output_file = Path(DEFAULT_EXTRACTOR_OUTPUT_DIRECTORY) / f"risk_factors_{ticker}.json"
 
         click.echo(f"Parsing risk factors from filings in: {filings_path}")
@@ -118,6 +140,19 @@ def parse_risk_factors(ticker):
 @click.option("--model", default=os.getenv("MODEL_NAME", "BAAI/bge-small-en"), show_default=True)
 def ingest(csv_path, ticker, cik, year, filing_type, source, mode, model):
     """Ingest a CSV file into the vector database."""
+    from sec_analyzer.schemas import Filing
+    from sec_analyzer.vector_db.chunking import (
+        process_csv_to_natural_language,
+        process_csv_to_raw_string,
+        process_csv_original_method,
+    )
+    from sec_analyzer.vector_db.embedding import (
+        calculate_embeddings_from_chunks,
+        insert_filing_with_embeddings,
+        select_chunks_to_embed,
+    )
+    from sec_analyzer.vector_db.model_loader import load_model_and_tokenizer
+
     if mode == "nl":
         chunks = process_csv_to_natural_language(csv_path)
     elif mode == "raw":
@@ -128,17 +163,17 @@ def ingest(csv_path, ticker, cik, year, filing_type, source, mode, model):
     if not chunks:
         raise click.ClickException("No chunks produced from CSV.")
 
+    chunks = select_chunks_to_embed(chunks)
+    if not chunks:
+        click.echo("✅ Ingest complete. All chunks are already stored; nothing to embed.")
+        return
+
     mdl, tok = load_model_and_tokenizer(model)
-    
-    from sec_analyzer.vector_db.embedding import calculate_embeddings_from_chunks
     embs = calculate_embeddings_from_chunks(mdl, tok, chunks)
     
     filing = Filing(cik=cik, ticker=ticker, filing_type=filing_type, year=year, source=source or os.path.basename(csv_path))
-    result = insert_filing_with_embeddings(filing, chunks, embs)
-    
-    upserts = result.upserted_count if result else 0
-    matched = result.matched_count if result else 0
-    click.echo(f"✅ Ingest complete. Upserts: {upserts} | Matched: {matched}")
+    inserted, duplicates = insert_filing_with_embeddings(filing, chunks, embs)
+    click.echo(f"✅ Ingest complete. Inserted: {inserted} | Duplicates: {duplicates}")
 
 @cli.command()
 @click.option("--q", "query_text", required=True, help="The question you want to ask.")
@@ -148,7 +183,11 @@ def ingest(csv_path, ticker, cik, year, filing_type, source, mode, model):
 @click.option("--model", default=os.getenv("MODEL_NAME", "BAAI/bge-small-en"), show_default=True)
 def query(query_text, k, ticker, year_gte, model):
     """Perform a semantic search on the vector database."""
-    client = MongoClient(os.getenv("MONGODB_URI"))
+    from sec_analyzer.vector_db.model_loader import load_model_and_tokenizer
+    from sec_analyzer.vector_db.mongo import get_mongo_client
+    from sec_analyzer.vector_db.search_service import vector_search_with_filter
+
+    client = get_mongo_client()
     col = client[os.getenv("DB_NAME")][os.getenv("COLLECTION_NAME", "embedded_chunks")]
     index_name = os.getenv("SEARCH_INDEX_NAME", "vector_index")
     mdl, tok = load_model_and_tokenizer(model)
@@ -1,9 +1,15 @@
 from typing import Any, Optional, Dict, List
 from langchain_core.documents import Document
 from langchain_core.retrievers import BaseRetriever
+from pydantic import Field
 from pymongo.collection import Collection
 
-from src.sec_analyzer.vector_db.search_service import vector_search_with_filter
+from module3.query_cache import QueryCache
+from module3.similarity_cache import SimilarityCache, query_entities
+from src.sec_analyzer.vector_db.search_service import (
+    generate_embeddings,
+    vector_search_many_by_embedding,
+)
 
 
 class SECRetriever(BaseRetriever):
@@ -18,6 +24,23 @@ class SECRetriever(BaseRetriever):
     tokenizer: Any
     k: int = 5
     metadata_fields: List[str] = ["cik", "ticker", "year", "source"]
+    query_cache: QueryCache = Field(default_factory=QueryCache)
+    # Reuses results for reworded queries whose embeddings are near-identical to a recent one; None disables it
+    similarity_cache: Optional[SimilarityCache] = None
+    # Query text -> embedding, filled ahead of time for known questions (see precompute_query_embeddings)
+    precomputed_embeddings: Dict[str, List[float]] = Field(default_factory=dict)
+
+    def precompute_query_embeddings(self, queries: List[str]) -> None:
+        """Embed known queries (e.g. example questions) now, in one forward pass, so asking them later skips the model."""
+        new_queries = [query for query in dict.fromkeys(queries) if query not in self.precomputed_embeddings]
+        if new_queries:
+            self.precomputed_embeddings.update(zip(new_queries, generate_embeddings(new_queries, self.model, self.tokenizer)))
+
+    def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Return query embeddings, computing only those not precomputed (together, in one forward pass)."""
+        to_embed = [query for query in queries if query not in self.precomputed_embeddings]
+        computed = dict(zip(to_embed, generate_embeddings(to_embed, self.model, self.tokenizer))) if to_embed else {}
+        return [self.precomputed_embeddings.get(query) or computed[query] for query in queries]
 
     def _get_relevant_documents(self, query: str, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
         """Return relevant documents for the query.
@@ -29,23 +52,78 @@ class SECRetriever(BaseRetriever):
         Returns:
             List of LangChain Document objects
         """
-        # Perform vector search
-        raw_results = vector_search_with_filter(
-            collection=self.collection,
-            index_name=self.search_index_name,
-            query_text=query,
-            model=self.model,
-            tokenizer=self.tokenizer,
-            limit=self.k,
-            filters=filters
-        )
-
-        # Convert to LangChain Documents
+        return self._get_relevant_documents_batch([query], filters=filters)[0]
+
+    def _get_relevant_documents_batch(self, queries: List[str], filters: Optional[Dict[str, Any]] = None,
+                                      include_embedding: bool = False) -> List[List[Document]]:
+        """Return relevant documents for several queries at once.
+
+        Lookups go through the exact query cache, then (once embedded) the
+        similarity cache, if one is set. Uncached queries without a precomputed embedding are
+        embedded together in one forward pass, and the remaining vector searches
+        go to Atlas as one aggregation.
+
+        Args:
+            queries: The search query texts
+            filters: Optional MongoDB filters applied to every query
+            include_embedding: Also return each chunk's stored vector as metadata["embedding"]
+
+        Returns:
+            One list of LangChain Document objects per query, in query order
+        """
+        cache_keys = [QueryCache.make_key(query, filters, self.k, include_embedding) for query in queries]
+        raw_results_per_query = [self.query_cache.get(cache_key) for cache_key in cache_keys]
+        # dict.fromkeys: a query repeated in the batch is searched only once
+        missing_queries = list(dict.fromkeys(
+            query for query, raw_results in zip(queries, raw_results_per_query) if raw_results is None
+        ))
+
+        if missing_queries:
+            context = QueryCache.make_context_key(filters, self.k, include_embedding)
+            resolved: Dict[str, list] = {}
+            to_search: Dict[str, List[float]] = {}
+            for query, query_vector in zip(missing_queries, self._embed_queries(missing_queries)):
+                similar_results = None
+                if self.similarity_cache is not None:
+                    similar_results = self.similarity_cache.get((context, query_entities(query)), query_vector)
+                if similar_results is not None:
+                    resolved[query] = similar_results
+                else:
+                    to_search[query] = query_vector
+
+            if to_search:
+                searched = vector_search_many_by_embedding(
+                    collection=self.collection,
+                    index_name=self.search_index_name,
+                    query_vectors=list(to_search.values()),
+                    limit=self.k,
+                    filters=filters,
+                    include_embedding=include_embedding
+                )
+                for (query, query_vector), raw_results in zip(to_search.items(), searched):
+                    if self.similarity_cache is not None:
+                        self.similarity_cache.put((context, query_entities(query)), query_vector, raw_results)
+                    resolved[query] = raw_results
+
+            for query, raw_results in resolved.items():
+                self.query_cache.put(QueryCache.make_key(query, filters, self.k, include_embedding), raw_results)
+            raw_results_per_query = [
+                resolved[query] if raw_results is None else raw_results
+                for query, raw_results in zip(queries, raw_results_per_query)
+            ]
+
+        return [self._to_documents(raw_results) for raw_results in raw_results_per_query]
+
+    def _to_documents(self, raw_results: List[Dict[str, Any]]) -> List[Document]:
+        """Convert raw search results into LangChain Documents."""
+        # Fresh objects each call, so callers cannot alter cached results
         documents = []
         for result in raw_results:
             # Extract metadata
             metadata = {field: result.get(field) for field in self.metadata_fields}
             metadata["score"] = result.get("score")
+            if "embedding" in result:
+                metadata["embedding"] = result["embedding"]
 
             # Create Document
             doc = Document(
@@ -1,6 +1,81 @@
+import contextlib
+import itertools
+import sys
+import threading
 import time
 
 
+class _SpinnerOutput:
+    """Stand-in for sys.stdout while a spinner runs: whatever the block prints first clears the spinner line.
+
+    The spinner is only drawn at the start of a line, so output printed in pieces is not overwritten.
+    """
+
+    def __init__(self, stream, message):
+        self._stream = stream
+        self._message = message
+        self._lock = threading.Lock()
+        self._spinner_shown = False
+        self._at_line_start = True
+
+    def _clear(self):
+        if self._spinner_shown:
+            self._stream.write("\r" + " " * (len(self._message) + 2) + "\r")
+            self._spinner_shown = False
+
+    def draw(self, frame):
+        with self._lock:
+            if self._at_line_start:
+                self._stream.write(f"\r{self._message} {frame}")
+                self._stream.flush()
+                self._spinner_shown = True
+
+    def close(self):
+        with self._lock:
+            self._clear()
+            self._stream.flush()
+
+    def write(self, text):
+        with self._lock:
+            self._clear()
+            if text:
+                self._at_line_start = text.endswith("\n")
+            return self._stream.write(text)
+
+    def flush(self):
+        with self._lock:
+            self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+@contextlib.contextmanager
+def spinner(message):
+    """Show a spinner after message on a background thread until the block exits, then clear the line.
+
+    The block's own prints go through the same writer, so they replace the spinner line instead of mixing with it.
+    """
+    output = _SpinnerOutput(sys.stdout, message)
+    done = threading.Event()
+
+    def spin():
+        for frame in itertools.cycle("|/-\\"):
+            output.draw(frame)
+            if done.wait(0.1):
+                break
+
+    thread = threading.Thread(target=spin, daemon=True)
+    with contextlib.redirect_stdout(output):
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+            output.close()
+
+
 def run_interactive_cli(rag_service):
     """
     Runs the interactive CLI loop for the RAG service.
@@ -23,6 +98,9 @@ def run_interactive_cli(rag_service):
         "How much cash does Apple have on hand?"
     ]
 
+    # Embed the example questions once up front; selecting one later skips the embedding model
+    rag_service.warmup_examples(examples)
+
     # ---------------------------------------------------------
     # HELPER FUNCTIONS
     # ---------------------------------------------------------
@@ -93,17 +171,16 @@ def run_interactive_cli(rag_service):
                     continue
 
             # Process Question
-            print(f"Thinking...", end="", flush=True)
-            start_time = time.time()
+            start_time = time.perf_counter()
 
             # Get Answer
-            answer = rag_service.ask(
-                user_input,
-                ticker=current_ticker
-            )
+            with spinner("Thinking..."):
+                answer = rag_service.ask(
+                    user_input,
+                    ticker=current_ticker
+                )
 
-            elapsed_time = time.time() - start_time
-            print(f"\r", end="")  # Clear the "Thinking..." line
+            elapsed_time = time.perf_counter() - start_time
 
             # Display Output
             print("-" * 60)
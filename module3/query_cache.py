@@ -0,0 +1,90 @@
+"""Query result cache for SEC filing vector search.
+
+Keeps recent search results in memory so repeated questions (and repeated
+sub-queries from question decomposition) skip the Atlas round trip.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+def _freeze(value: Any) -> Hashable:
+    """Convert nested dicts/lists (e.g. MongoDB filters) into a hashable, order-independent key."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class QueryCache:
+    """Thread-safe LRU cache with a time-to-live for vector search results."""
+
+    def __init__(self, max_size: int = 256, ttl_seconds: float = 300.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(query: str, filters: Optional[Dict[str, Any]], k: int, *variant: Hashable) -> Hashable:
+        """Build the cache key for a search.
+
+        Args:
+            query: The search query text
+            filters: Optional MongoDB filters (may be nested)
+            k: Number of results requested
+            variant: Anything else that changes the result shape (e.g. extra projected fields)
+
+        Returns:
+            A hashable key
+        """
+        return (query, *QueryCache.make_context_key(filters, k, *variant))
+
+    @staticmethod
+    def make_context_key(filters: Optional[Dict[str, Any]], k: int, *variant: Hashable) -> Hashable:
+        """Build the part of the cache key that does not depend on the query text (see make_key)."""
+        return (_freeze(filters or {}), k, *variant)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry when full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Drop every cached result (call after writing to the collection)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
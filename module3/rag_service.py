@@ -5,10 +5,12 @@ Provides a complete RAG pipeline combining SEC filing vector search with LLMs.
 """
 
 import os
+import re
 import sys
 import time
 from typing import Optional, Dict, Any
 from dataclasses import dataclass
+import numpy as np
 from dotenv import load_dotenv
 
 from langchain_core.prompts import ChatPromptTemplate
@@ -20,12 +22,55 @@ from module3.cli import run_interactive_cli
 
 sys.path.append(os.path.abspath("src"))
 
-from pymongo import MongoClient
 from module3.SECRetriever import SECRetriever
+from module3.similarity_cache import SimilarityCache
 from src.sec_analyzer.vector_db.model_loader import load_model_and_tokenizer
+from src.sec_analyzer.vector_db.mongo import close_mongo_client, get_mongo_client
+from src.sec_analyzer.vector_db.search_service import generate_embedding
 
 load_dotenv()
 
+# Chunks whose embeddings are at least this similar are treated as the same content
+NEAR_DUPLICATE_SIMILARITY = 0.97
+
+# Placed between documents in the LLM context
+CONTEXT_SEPARATOR = "\n\n" + "=" * 80 + "\n\n"
+
+SYSTEM_PROMPT = """You are an expert financial analyst specializing in SEC filing analysis.
+
+Analyze financial data from SEC 10-K filings and provide insightful, data-driven answers.
+
+IMPORTANT:
+- Use ONLY the provided context - do not add external information
+- Pay close attention to DATES and YEARS in the context (they appear as 'as of YYYY-MM-DD' or in metadata)
+- Analyze trends, patterns, and changes over time when multiple data points are provided
+- When you see multiple values for the same metric, identify:
+  * The most recent value (highest date/year)
+  * Trends over time
+  * Significant changes or fluctuations
+- Be precise with figures, units (USD, shares, etc.), and dates
+- If the context doesn't contain information to answer a question, state this clearly
+- Provide brief explanations for what the numbers might indicate
+- Keep responses concise but informative (3-6 paragraphs max)
+
+Context from SEC filings:
+{context}"""
+
+# Question decomposition: each financial term found in a multi-part question becomes its own sub-query.
+# Plain substring checks (not one regex alternation) so overlapping terms like "ebit"/"ebitda" all count.
+FINANCIAL_TERMS = (
+    "stockholders equity", "stockholder equity", "shareholder equity",
+    "operating income", "operating loss", "operating profit",
+    "net income", "net loss", "revenue", "sales",
+    "cash flow", "operating cash flow", "free cash flow",
+    "assets", "liabilities", "debt", "expenses",
+    "r&d", "research and development",
+    "gross profit", "gross margin",
+    "ebitda", "ebit"
+)
+TICKER_RE = re.compile(r'\b[A-Z]{1,5}\b')
+COMPANY_RE = re.compile(r'\b(Apple|Microsoft|Amazon|Google|Tesla|Meta)\b', re.IGNORECASE)
+
 
 class SimpleTextLLM:
     """Simple text-based LLM fallback that returns retrieved context."""
@@ -45,6 +90,8 @@ class RAGConfig:
     llm_model_name: str = "mistral-small-2503"
     llm_temperature: float = 0.0
     retrieval_k: int = 5
+    # Serve reworded questions from recent results with near-identical embeddings (see SimilarityCache)
+    similarity_cache: bool = os.getenv("SIMILARITY_CACHE", "").lower() in ("1", "true", "yes")
 
 
 class SECRAGService:
@@ -58,15 +105,17 @@ class SECRAGService:
         # Component placeholders
         self.client = self.db = self.collection = None
         self.embedding_model = self.tokenizer = self.retriever = None
-        self.rag_chain = self.llm = None
+        self.rag_chain = self.llm = self.prompt = None
 
     def setup(self) -> None:
         """Setup all RAG service components."""
         print(f"Loading embedding model: {self.config.embedding_model_name}")
         self.embedding_model, self.tokenizer = load_model_and_tokenizer(self.config.embedding_model_name)
+        # One throwaway query so model compilation / device warm-up is not paid by the first user question
+        generate_embedding("warmup", self.embedding_model, self.tokenizer)
 
         print(f"Connecting to MongoDB: {self.config.db_name}.{self.config.collection_name}")
-        self.client = MongoClient(self.config.mongo_uri)
+        self.client = get_mongo_client(self.config.mongo_uri)  # Shared with other services in this process
         self.db = self.client[self.config.db_name]
         self.collection = self.db[self.config.collection_name]
 
@@ -76,6 +125,7 @@ class SECRAGService:
             model=self.embedding_model,
             tokenizer=self.tokenizer,
             k=self.config.retrieval_k,
+            similarity_cache=SimilarityCache() if self.config.similarity_cache else None,
         )
 
         print(f"Initializing LLM: {self.config.llm_model_name}")
@@ -84,6 +134,16 @@ class SECRAGService:
         self.rag_chain = self._build_rag_chain()
         print("SEC RAG Service setup complete!\n")
 
+    def warmup_examples(self, texts: list[str]) -> None:
+        """Precompute query embeddings for known questions so asking them skips the embedding model.
+
+        Args:
+            texts: Questions likely to be asked verbatim (e.g. the CLI's example list)
+        """
+        if not self.retriever:
+            raise RuntimeError("RAG service not initialized. Call setup() first.")
+        self.retriever.precompute_query_embeddings(texts)
+
     def _initialize_llm(self):
         """Initialize LLM with fallback options."""
         # Try MistralAI first
@@ -124,22 +184,13 @@ class SECRAGService:
         Returns:
             Formatted context string with metadata
         """
-        formatted_docs = []
-        for i, doc in enumerate(docs, 1):
-            # Extract metadata
-            metadata = doc.metadata
-            ticker = metadata.get('ticker', 'N/A')
-            year = metadata.get('year', 'N/A')
-            source = metadata.get('source', 'N/A')
-            score = metadata.get('score', 0)
-
-            # Format document with metadata header
-            formatted_doc = f"""[Document {i}] (Score: {score:.4f})
-Ticker: {ticker} | Year: {year} | Source: {source}
-{doc.page_content}"""
-            formatted_docs.append(formatted_doc)
-
-        return "\n\n" + "="*80 + "\n\n".join(formatted_docs)
+        return CONTEXT_SEPARATOR.join(
+            f"[Document {i}] (Score: {doc.metadata.get('score', 0):.4f})\n"
+            f"Ticker: {doc.metadata.get('ticker', 'N/A')} | Year: {doc.metadata.get('year', 'N/A')} | "
+            f"Source: {doc.metadata.get('source', 'N/A')}\n"
+            f"{doc.page_content}"
+            for i, doc in enumerate(docs, 1)
+        )
 
     def _get_context_with_metadata(self, query: str, filters=None, ticker=None, year_gte=None) -> str:
         """Get and format context documents with metadata.
@@ -159,32 +210,14 @@ Ticker: {ticker} | Year: {year} | Source: {source}
 
     def _build_rag_chain(self):
         """Build the LangChain RAG pipeline."""
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an expert financial analyst specializing in SEC filing analysis.
-
-Analyze financial data from SEC 10-K filings and provide insightful, data-driven answers.
-
-IMPORTANT:
-- Use ONLY the provided context - do not add external information
-- Pay close attention to DATES and YEARS in the context (they appear as 'as of YYYY-MM-DD' or in metadata)
-- Analyze trends, patterns, and changes over time when multiple data points are provided
-- When you see multiple values for the same metric, identify:
-  * The most recent value (highest date/year)
-  * Trends over time
-  * Significant changes or fluctuations
-- Be precise with figures, units (USD, shares, etc.), and dates
-- If the context doesn't contain information to answer a question, state this clearly
-- Provide brief explanations for what the numbers might indicate
-- Keep responses concise but informative (3-6 paragraphs max)
-
-Context from SEC filings:
-{context}"""),
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", SYSTEM_PROMPT),
             ("human", "{question}")
         ])
 
         return (
             {"context": self._get_context_with_metadata, "question": RunnablePassthrough()}
-            | prompt
+            | self.prompt
             | self.llm
             | StrOutputParser()
         )
@@ -207,44 +240,18 @@ Context from SEC filings:
         Returns:
             List of sub-queries
         """
+        question_lower = question.lower()
         # Check if question asks for multiple types of information
-        if " and " in question.lower() or " what are " in question.lower():
-            # Extract key financial terms
-            financial_terms = [
-                "stockholders equity", "stockholder equity", "shareholder equity",
-                "operating income", "operating loss", "operating profit",
-                "net income", "net loss", "revenue", "sales",
-                "cash flow", "operating cash flow", "free cash flow",
-                "assets", "liabilities", "debt", "expenses",
-                "r&d", "research and development",
-                "gross profit", "gross margin",
-                "ebitda", "ebit"
-            ]
-
-            # Check which terms appear in the question
-            question_lower = question.lower()
-            detected_terms = [term for term in financial_terms if term in question_lower]
+        if " and " in question_lower or " what are " in question_lower:
+            # Check which key financial terms appear in the question
+            detected_terms = [term for term in FINANCIAL_TERMS if term in question_lower]
 
             if len(detected_terms) > 1:
-                # Create sub-queries for each detected term
-                sub_queries = []
-                ticker_match = None
-                company_match = None
-
-                # Extract ticker or company name if present
-                import re
-                ticker_match = re.search(r'\b[A-Z]{1,5}\b', question)
-                company_match = re.search(r'\b(Apple|Microsoft|Amazon|Google|Tesla|Meta)\b', question, re.IGNORECASE)
-
-                for term in detected_terms:
-                    if ticker_match:
-                        sub_queries.append(f"{ticker_match.group()} {term}")
-                    elif company_match:
-                        sub_queries.append(f"{company_match.group()} {term}")
-                    else:
-                        sub_queries.append(term)
-
-                return sub_queries
+                # Prefix each sub-query with the ticker, else the company name, if present
+                subject_match = TICKER_RE.search(question) or COMPANY_RE.search(question)
+                if subject_match:
+                    return [f"{subject_match.group()} {term}" for term in detected_terms]
+                return detected_terms
 
         # If no decomposition needed, return original question
         return [question]
@@ -263,22 +270,54 @@ Context from SEC filings:
         """
         query_filters = self._build_filters(filters, ticker, year_gte)
         all_docs = []
-        seen_contents = set()  # Track seen content to avoid duplicates
-
-        # Retrieve for each sub-query
-        for sub_query in queries:
-            docs = self.retriever._get_relevant_documents(sub_query, filters=query_filters)
+        seen_contents: set[str] = set()  # Track seen content to avoid duplicates
 
+        # Retrieve for all sub-queries together (one embedding pass, one search round trip)
+        for docs in self.retriever._get_relevant_documents_batch(queries, filters=query_filters, include_embedding=True):
             # Add non-duplicate documents
             for doc in docs:
-                content_hash = hash(doc.page_content)
-                if content_hash not in seen_contents:
-                    seen_contents.add(content_hash)
+                # Keep the strings, not hash(): str caches its hash, and distinct chunks are never confused
+                if doc.page_content not in seen_contents:
+                    seen_contents.add(doc.page_content)
                     all_docs.append(doc)
 
         # Sort by score and return top results (up to original k limit)
         all_docs.sort(key=lambda x: x.metadata.get('score', 0), reverse=True)
-        return all_docs[:self.config.retrieval_k]
+        top_docs = self._drop_near_duplicates(all_docs, self.config.retrieval_k)
+        for doc in top_docs:
+            doc.metadata.pop("embedding", None)  # Only needed for the near-duplicate check
+        return top_docs
+
+    @staticmethod
+    def _drop_near_duplicates(docs: list[Document], limit: int) -> list[Document]:
+        """Keep up to limit documents, skipping any too similar to a higher-scored one already kept from another source.
+
+        Chunks of one filing are never compared: its facts for different periods or segments embed almost
+        identically (e.g. the same line item for several years) yet carry different figures. The check is
+        for the same content stored again from another filing.
+
+        Args:
+            docs: Documents sorted by descending score, with metadata["embedding"] set
+            limit: Maximum number of documents to keep
+
+        Returns:
+            The kept documents, in score order
+        """
+        if len(docs) < 2 or any(doc.metadata.get("embedding") is None for doc in docs):
+            return docs[:limit]  # Nothing to compare against (exact duplicates were already removed)
+
+        # Stored vectors are L2-normalised, so one matrix product gives every pairwise cosine similarity
+        embeddings = np.vstack([doc.metadata["embedding"] for doc in docs]).astype(np.float32, copy=False)
+        similarities = embeddings @ embeddings.T
+        sources = np.array([doc.metadata.get("source") for doc in docs], dtype=object)
+        similarities[sources[:, None] == sources[None, :]] = -1.0
+        kept: list[int] = []
+        for i in range(len(docs)):
+            if not kept or similarities[i, kept].max() <= NEAR_DUPLICATE_SIMILARITY:
+                kept.append(i)
+                if len(kept) == limit:
+                    break
+        return [docs[i] for i in kept]
 
     def ask(self, question: str, filters=None, ticker=None, year_gte=None) -> str:
         """Ask a question and get an answer from the RAG system."""
@@ -315,33 +354,10 @@ Context from SEC filings:
                     docs = self.retriever._get_relevant_documents(query, filters=query_filters)
                 return self._format_context_with_metadata(docs)
 
-            # Build a completely new chain with the filtered retriever
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", """You are an expert financial analyst specializing in SEC filing analysis.
-
-Analyze financial data from SEC 10-K filings and provide insightful, data-driven answers.
-
-IMPORTANT:
-- Use ONLY the provided context - do not add external information
-- Pay close attention to DATES and YEARS in the context (they appear as 'as of YYYY-MM-DD' or in metadata)
-- Analyze trends, patterns, and changes over time when multiple data points are provided
-- When you see multiple values for the same metric, identify:
-  * The most recent value (highest date/year)
-  * Trends over time
-  * Significant changes or fluctuations
-- Be precise with figures, units (USD, shares, etc.), and dates
-- If the context doesn't contain information to answer a question, state this clearly
-- Provide brief explanations for what the numbers might indicate
-- Keep responses concise but informative (3-6 paragraphs max)
-
-Context from SEC filings:
-{context}"""),
-                ("human", "{question}")
-            ])
-
+            # Same parsed prompt as the default chain; only the context source changes
             filtered_rag_chain = (
                 {"context": filtered_retriever, "question": RunnablePassthrough()}
-                | prompt
+                | self.prompt
                 | self.llm
                 | StrOutputParser()
             )
@@ -379,7 +395,8 @@ Context from SEC filings:
     def close(self) -> None:
         """Clean up resources."""
         if self.client:
-            self.client.close()
+            close_mongo_client(self.config.mongo_uri)
+            self.client = None
             print("MongoDB connection closed.")
 
 def main():
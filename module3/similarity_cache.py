@@ -0,0 +1,115 @@
+"""Similarity cache for SEC filing vector search.
+
+Reuses the results of a recent search whose query embedding is nearly
+identical to a new one (e.g. the same question reworded), so the new query
+skips the Atlas round trip. Complements the exact-match QueryCache.
+
+Questions about different years or companies can embed almost identically
+("Apple revenue 2022" / "Apple revenue 2023"), so callers key each lookup
+on query_entities() as well as on the search context. Off unless enabled.
+"""
+
+import re
+import threading
+import time
+from typing import Any, FrozenSet, Hashable, List, Optional
+
+import numpy as np
+
+# Numbers (years, amounts) and capitalised words (companies, tickers); possessives stop at the apostrophe
+_ENTITY_RE = re.compile(r"\d[\d,.]*\d|\d|[A-Z][A-Za-z&-]*")
+# Capitalised only because they start the question
+_QUESTION_WORDS = frozenset({
+    "what", "how", "which", "when", "who", "why", "where", "did", "does", "do", "is", "was", "were", "are",
+    "show", "list", "give", "compare", "tell", "summarize", "describe",
+})
+
+
+def query_entities(query: str) -> FrozenSet[str]:
+    """Return the numbers and names in a query; only queries with equal sets may share cached results."""
+    entities = [match.group().lower().rstrip(".,") for match in _ENTITY_RE.finditer(query)]
+    if entities and query.lstrip().lower().startswith(entities[0]) and entities[0] in _QUESTION_WORDS:
+        entities = entities[1:]
+    return frozenset(entities)
+
+
+class SimilarityCache:
+    """Thread-safe, fixed-capacity cache of (query embedding -> search results), looked up by cosine similarity."""
+
+    def __init__(self, capacity: int = 512, threshold: float = 0.95, ttl_seconds: float = 300.0):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self._embeddings: Optional[np.ndarray] = None  # (capacity, dim) float32, allocated on first put
+        self._contexts: List[Hashable] = []
+        self._results: List[Any] = []
+        self._stored_at = np.zeros(capacity)
+        self._last_used = np.zeros(capacity)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, context: Hashable, query_embedding: List[float]) -> Optional[Any]:
+        """Return cached results for the most similar query searched in the same context, if similar enough.
+
+        Args:
+            context: What else the results depend on (filters, k, ...); only equal contexts are compared
+            query_embedding: L2-normalised embedding of the new query
+
+        Returns:
+            The cached results, or None on a miss
+        """
+        with self._lock:
+            rows = [i for i, row_context in enumerate(self._contexts) if row_context == context]
+            if rows:
+                now = time.monotonic()
+                rows = np.array(rows)
+                rows = rows[now - self._stored_at[rows] <= self.ttl_seconds]
+            if len(rows) == 0:
+                self.misses += 1
+                return None
+            # Rows and query are L2-normalised, so the dot product is the cosine similarity
+            similarities = self._embeddings[rows] @ np.asarray(query_embedding, dtype=np.float32)
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+            self._last_used[rows[best]] = now
+            self.hits += 1
+            return self._results[rows[best]]
+
+    def put(self, context: Hashable, query_embedding: List[float], results: Any) -> None:
+        """Store results for a query, replacing the least recently used entry when full."""
+        query_embedding = np.asarray(query_embedding, dtype=np.float32)
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings = np.empty((self.capacity, query_embedding.shape[0]), dtype=np.float32)
+            if len(self._results) < self.capacity:
+                row = len(self._results)
+                self._contexts.append(context)
+                self._results.append(results)
+            else:
+                row = int(np.argmin(self._last_used))
+                self._contexts[row] = context
+                self._results[row] = results
+            self._embeddings[row] = query_embedding
+            self._stored_at[row] = self._last_used[row] = time.monotonic()
+
+    def invalidate(self) -> None:
+        """Drop every cached result (call after writing to the collection)."""
+        with self._lock:
+            self._contexts.clear()
+            self._results.clear()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._results),
+                "capacity": self.capacity,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
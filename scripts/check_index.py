@@ -1,11 +1,12 @@
 import os, sys
 from dotenv import load_dotenv
-from pymongo import MongoClient
 
 sys.path.append(os.path.abspath("src"))
 
+from sec_analyzer.vector_db.mongo import get_mongo_client
+
 load_dotenv()
-client = MongoClient(os.getenv("MONGODB_URI"))
+client = get_mongo_client()
 col = client[os.getenv("DB_NAME")][os.getenv("COLLECTION_NAME", "embedded_chunks")]
 for idx in col.aggregate([{ "$listSearchIndexes": {} }]):
     print(idx.get("name"), idx.get("type"), idx.get("latestDefinition", {}))
\ No newline at end of file
@@ -11,7 +11,13 @@ from sec_analyzer.vector_db.chunking import (
     process_csv_to_raw_string,
     process_csv_original_method,
 )
-from sec_analyzer.vector_db.embedding import calculate_embeddings_from_chunks, insert_filing_with_embeddings
+from sec_analyzer.vector_db.embedding import (
+    EMBED_BATCH_SIZE,
+    EMBED_MAX_TOKENS,
+    calculate_embeddings_from_chunks,
+    insert_filing_with_embeddings,
+    select_chunks_to_embed,
+)
 from sec_analyzer.vector_db.model_loader import load_model_and_tokenizer
 
 
@@ -26,6 +32,10 @@ def main():
     parser.add_argument("--mode", choices=["nl", "raw", "merge"], default="nl",
                         help="Chunking mode: nl=natural language, raw=row strings, merge=merge-all-then-split")
     parser.add_argument("--model", default=os.getenv("MODEL_NAME", "BAAI/bge-small-en"))
+    parser.add_argument("--batch_size", type=int, default=EMBED_BATCH_SIZE,
+                        help="Max chunks per forward pass")
+    parser.add_argument("--max_tokens", type=int, default=EMBED_MAX_TOKENS,
+                        help="Padded tokens per forward pass (0 = no cap)")
     args = parser.parse_args()
 
     load_dotenv()
@@ -42,9 +52,15 @@ def main():
         print("No chunks produced; aborting.")
         return
 
+    chunks = select_chunks_to_embed(chunks)
+    if not chunks:
+        print("All chunks are already stored; nothing to embed.")
+        return
+
     model, tokenizer = load_model_and_tokenizer(args.model)
 
-    embeddings = calculate_embeddings_from_chunks(model, tokenizer, chunks)
+    embeddings = calculate_embeddings_from_chunks(model, tokenizer, chunks, batch_size=args.batch_size,
+                                                  max_tokens=args.max_tokens)
 
     filing = Filing(
         cik=args.cik,
@@ -54,12 +70,8 @@ def main():
         source=args.source or os.path.basename(args.csv),
     )
 
-    result = insert_filing_with_embeddings(filing, chunks, embeddings)
-    if result:
-        print("Upserts:", result.upserted_count, "Matched (dupes):", result.matched_count)
-        print("WriteErrors:", len(result.bulk_api_result.get("writeErrors", [])))
-    else:
-        print("Nothing written.")
+    inserted, duplicates = insert_filing_with_embeddings(filing, chunks, embeddings)
+    print("Inserted:", inserted, "Duplicates:", duplicates)
 
 
 if __name__ == "__main__":
@@ -1,11 +1,11 @@
 from __future__ import annotations
 import os, sys, argparse
 from dotenv import load_dotenv
-from pymongo import MongoClient
 
 sys.path.append(os.path.abspath("src"))
 
 from sec_analyzer.vector_db.model_loader import load_model_and_tokenizer
+from sec_analyzer.vector_db.mongo import get_mongo_client
 from sec_analyzer.vector_db.search_service import vector_search_with_filter
 
 
@@ -20,7 +20,7 @@ def main():
 
     load_dotenv()
 
-    client = MongoClient(os.getenv("MONGODB_URI"))
+    client = get_mongo_client()
     col = client[os.getenv("DB_NAME")][os.getenv("COLLECTION_NAME", "embedded_chunks")]
     index_name = os.getenv("SEARCH_INDEX_NAME", "vector_index")
 
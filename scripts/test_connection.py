@@ -1,12 +1,13 @@
 import os, sys
 from dotenv import load_dotenv
-from pymongo import MongoClient
 
 # allow running without setting PYTHONPATH manually
 sys.path.append(os.path.abspath("src"))
 
+from sec_analyzer.vector_db.mongo import get_mongo_client
+
 load_dotenv()
-client = MongoClient(os.getenv("MONGODB_URI"))
+client = get_mongo_client()
 db = client[os.getenv("DB_NAME")]
 col = db[os.getenv("COLLECTION_NAME", "embedded_chunks")]
 print("Connected to:", db.name, col.name)
@@ -2,6 +2,10 @@
 FETCHER_BASE_URL = "https://www.sec.gov/Archives/edgar/data"
 FETCHER_SUBMISSIONS_URL = "https://data.sec.gov/submissions/CIK{}.json"
 FETCHER_TICKER_CIK_MAPPING_URL = "https://www.sec.gov/files/company_tickers.json"
+FETCHER_TICKER_CACHE_PATH = "./.cache/company_tickers.json"
+FETCHER_TICKER_CACHE_TTL = 24 * 60 * 60  # Seconds; SEC refreshes the mapping roughly daily
+FETCHER_SUBMISSIONS_CACHE_DIRECTORY = "./.cache/submissions"
+FETCHER_SUBMISSIONS_CACHE_TTL = 24 * 60 * 60  # Seconds; short enough that a newly filed 10-K shows up the next day
 # In config/settings.py
 FETCHER_HEADERS = {
     "User-Agent": "MySECLearningProject YourName your.email@example.com",
@@ -13,7 +17,14 @@ FETCHER_HEADERS = {
 DEFAULT_FILINGS_DIRECTORY = "./filings"
 DEFAULT_EXTRACTOR_OUTPUT_DIRECTORY = "./output"
 DEFAULT_FETCHER_SUPPORTED_FILE_TYPES = (".htm", ".html", ".xml", ".xsd", ".txt") # Added .txt
-DEFAULT_FETCHER_IGNORED_KEYWORDS = ("companysearch", "-index.htm", "xslForm", "form.xsd") # Added form.xsd
+# Files whose names contain any of these (case-insensitive) are not downloaded: EDGAR index and header pages,
+# XSLT-rendered copies, the form schema, and the XBRL viewer's FilingSummary.xml (listed by index.json only)
+DEFAULT_FETCHER_IGNORED_KEYWORDS = ("companysearch", "-index.htm", "-index-headers.htm", "xslForm", "form.xsd", "FilingSummary.xml")
+DEFAULT_FETCHER_MAX_WORKERS = 10  # SEC fair-access policy allows ~10 requests/second
+FETCHER_MAX_REQUESTS_PER_SECOND = 10
+FETCHER_POOL_CONNECTIONS = 4  # Distinct hosts: www.sec.gov, data.sec.gov
+FETCHER_POOL_MAXSIZE = 16  # Keep-alive connections per host; must cover DEFAULT_FETCHER_MAX_WORKERS
+DEFAULT_PARSE_MAX_WORKERS = None  # Processes for CPU-bound extract/parse; None means os.cpu_count()
 
 # Text Processing (These might be for later modules)
 # CHUNK_SIZE = 512  # For text splitting
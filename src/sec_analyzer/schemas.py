@@ -3,7 +3,7 @@ from dataclasses import dataclass, asdict
 from typing import List, Optional, Dict, Any
 
 
-@dataclass
+@dataclass(slots=True)
 class Filing:
     cik: str
     ticker: str
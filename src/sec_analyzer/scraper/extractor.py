@@ -1,70 +1,225 @@
 # src/module1_scraper/extractor.py
+import os
 import re
 import pandas as pd
+from pandas.io.parsers import TextParser
 from pathlib import Path
-from bs4 import BeautifulSoup
-from io import StringIO
+from concurrent.futures import ProcessPoolExecutor
 from lxml import etree # type: ignore # lxml might not have stubs by default
 from typing import Dict, List, Optional
 
 from sec_analyzer.config import (
     DEFAULT_FILINGS_DIRECTORY,
-    DEFAULT_EXTRACTOR_OUTPUT_DIRECTORY
+    DEFAULT_EXTRACTOR_OUTPUT_DIRECTORY,
+    DEFAULT_PARSE_MAX_WORKERS
 )
-from sec_analyzer.utils import sanitize_filename
+from sec_analyzer.utils import company_dir, process_pool_context, sanitize_filename
+
+_XBRLI_NS = "http://www.xbrl.org/2003/instance"
+_XBRLI_CONTEXT_TAG = f"{{{_XBRLI_NS}}}context"
+_XBRLI_PERIOD_TAG = f"{{{_XBRLI_NS}}}period"
+# Clark-notation tag -> output column for the children of <xbrli:period>
+_XBRLI_PERIOD_FIELDS = {
+    f"{{{_XBRLI_NS}}}startDate": "startDate",
+    f"{{{_XBRLI_NS}}}endDate": "endDate",
+    f"{{{_XBRLI_NS}}}instant": "instant",
+}
+# Elements in these namespaces are XBRL plumbing (contexts, units, schema/linkbase refs), never facts.
+_NON_FACT_NAMESPACE_PREFIXES = (
+    f"{{{_XBRLI_NS}}}",
+    "{http://www.w3.org/2001/XMLSchema-instance}",
+    "{http://www.xbrl.org/2003/linkbase}",
+)
+
+# A table is kept if its first rows mention "$"/"Consolidated" or its markup names a statement.
+_FINANCIAL_TABLE_KEYWORDS = ("balance sheet", "income statement", "cash flow", "operations")
+
+
+# --- HTML tables, read the way pd.read_html reads them ---
+
+_CELL_WHITESPACE_RE = re.compile(r"[\r\n]+|\s{2,}")  # Collapsed to one space in every cell, as read_html does
+_HIDDEN_STYLE_RE = re.compile(r"display:\s*none")
+_HAS_TEXT_RE = re.compile(r".+")
+
+
+def _cell_text(cell) -> str:
+    return _CELL_WHITESPACE_RE.sub(" ", "".join(cell.itertext())).strip()
+
+
+def _remove_element(elem) -> None:
+    """Remove elem and its subtree but keep the text that follows it."""
+    parent = elem.getparent()
+    if elem.tail:
+        previous = elem.getprevious()
+        if previous is not None:
+            previous.tail = (previous.tail or "") + elem.tail
+        else:
+            parent.text = (parent.text or "") + elem.tail
+    parent.remove(elem)
+
+
+def _expand_spans(rows: List[List]) -> List[List[str]]:
+    """Turn rows of <td>/<th> elements into rows of text, copying colspan/rowspan cells into the cells they cover."""
+    all_texts = []
+    remainder: List[tuple] = []  # (column index, text, rows still to fill) carried down by rowspan
+    for cells in rows:
+        texts: List[str] = []
+        next_remainder = []
+        index = 0
+        for cell in cells:
+            # Cells spanned down from earlier rows that sit before this one
+            while remainder and remainder[0][0] <= index:
+                prev_index, prev_text, prev_rowspan = remainder.pop(0)
+                texts.append(prev_text)
+                if prev_rowspan > 1:
+                    next_remainder.append((prev_index, prev_text, prev_rowspan - 1))
+                index += 1
+
+            text = _cell_text(cell)
+            rowspan = int(cell.get("rowspan") or 1)
+            colspan = int(cell.get("colspan") or 1)
+            for _ in range(colspan):
+                texts.append(text)
+                if rowspan > 1:
+                    next_remainder.append((index, text, rowspan - 1))
+                index += 1
+
+        for prev_index, prev_text, prev_rowspan in remainder:
+            texts.append(prev_text)
+            if prev_rowspan > 1:
+                next_remainder.append((prev_index, prev_text, prev_rowspan - 1))
+        all_texts.append(texts)
+        remainder = next_remainder
+
+    # Rows that exist only because an earlier row spans into them
+    while remainder:
+        next_remainder = []
+        texts = []
+        for prev_index, prev_text, prev_rowspan in remainder:
+            texts.append(prev_text)
+            if prev_rowspan > 1:
+                next_remainder.append((prev_index, prev_text, prev_rowspan - 1))
+        all_texts.append(texts)
+        remainder = next_remainder
+    return all_texts
+
+
+def _read_table(table_elem) -> Optional[pd.DataFrame]:
+    """Build the DataFrame pd.read_html returns for one table, from the already-parsed element.
+
+    Same rules as read_html: <br> becomes a line break, hidden cells and <style> blocks are dropped,
+    <thead> rows (or leading all-<th> rows) become the header, spans are expanded, ragged rows are
+    padded, and cells go through pandas' text parser (thousands=",") so numeric columns come back
+    as numbers.
+    Returns None when read_html would find no table.
+    """
+    if "display:none" in (table_elem.get("style") or "").replace(" ", ""):
+        return None
+    for br in table_elem.iter("br"):
+        # A line break separates the text around it; collapsed to a space with the rest of the cell's whitespace
+        br.tail = "\n" + (br.tail or "")
+    for elem in list(table_elem.iter("style")) + [
+        elem for elem in table_elem.iter() if elem is not table_elem and _HIDDEN_STYLE_RE.search(elem.get("style") or "")
+    ]:
+        if elem.getparent() is not None:  # Not already gone with a removed ancestor
+            _remove_element(elem)
+    if not any(_HAS_TEXT_RE.search(text) for text in table_elem.itertext()):
+        return None
+
+    header_rows, body_rows, footer_rows = [], [], []
+    for row_elem in table_elem.iter("tr"):
+        section = body_rows
+        for ancestor in row_elem.iterancestors():
+            if ancestor is table_elem:
+                break
+            if ancestor.tag == "thead":
+                section = header_rows
+                break
+            if ancestor.tag == "tfoot":
+                section = footer_rows
+                break
+        section.append(list(row_elem.iterchildren("td", "th")))
+    if not header_rows:
+        # No <thead>: leading rows made only of <th> cells are the header
+        while body_rows and all(cell.tag == "th" for cell in body_rows[0]):
+            header_rows.append(body_rows.pop(0))
+
+    head = _expand_spans(header_rows)
+    data = head + _expand_spans(body_rows) + _expand_spans(footer_rows)
+    if not data:
+        return None
+    header = None
+    if head:
+        header = 0 if len(head) == 1 else [i for i, row in enumerate(head) if any(row)]
+    width = max(len(row) for row in data)
+    data = [row + [""] * (width - len(row)) for row in data]
+    with TextParser(data, header=header, thousands=",") as parser:
+        return parser.read()
 
 
 class FilingsExtractor:
-    def __init__(self, filings_directory: str | Path = DEFAULT_FILINGS_DIRECTORY) -> None:
+    def __init__(self, filings_directory: str | Path = DEFAULT_FILINGS_DIRECTORY,
+                 max_workers: Optional[int] = DEFAULT_PARSE_MAX_WORKERS) -> None:
         self.filings_directory = Path(filings_directory)
+        self.max_workers = max_workers  # Worker processes for extract_data (None -> os.cpu_count())
 
     def get_company_filings(self, ticker: str) -> List[str]:
         """Get list of filings for a company."""
-        safe_ticker = sanitize_filename(ticker) # Use imported sanitize_filename
-        company_dir = self.filings_directory / safe_ticker
+        company_filings_dir = company_dir(ticker, self.filings_directory)
 
-        if not company_dir.exists() or not company_dir.is_dir(): # Check if it's a directory
-            raise FileNotFoundError(f"No filings directory found for {safe_ticker} at {company_dir}")
+        if not company_filings_dir.is_dir(): # Also covers the directory not existing
+            raise FileNotFoundError(f"No filings directory found for {company_filings_dir.name} at {company_filings_dir}")
 
         
-        return [f.name for f in company_dir.iterdir() if f.is_dir()]
+        # DirEntry.is_dir() uses the type bits from the directory read instead of a stat per entry
+        with os.scandir(company_filings_dir) as entries:
+            return [entry.name for entry in entries if entry.is_dir(follow_symlinks=False)]
 
     def extract_data(self, ticker: str, filings: List[str]) -> Dict[str, Optional[pd.DataFrame]]:
         """Extract structured data from filings."""
         results: Dict[str, Optional[pd.DataFrame]] = {}
-        safe_ticker_for_path = sanitize_filename(ticker) # Sanitize for path construction
+        company_filings_dir = company_dir(ticker, self.filings_directory)
 
+        filing_dirs: Dict[str, Path] = {}
         for filing_name in filings: 
-            filing_path_dir = self.filings_directory / safe_ticker_for_path / filing_name
+            filing_path_dir = company_filings_dir / filing_name
+            results[filing_name] = None # Stays None if the directory is missing or parsing fails
             
             if not filing_path_dir.is_dir():
                 print(f"⚠️ Expected filing directory not found or is not a directory: {filing_path_dir}")
-                results[filing_name] = None
                 continue
+            filing_dirs[filing_name] = filing_path_dir
 
-            parsed_data = self._parse_filing(filing_path_dir) # Pass the directory of the specific filing
-            results[filing_name] = parsed_data # Can be None if parsing fails
+        if len(filing_dirs) > 1:
+            # Each filing's lxml/pandas parse is CPU-bound and independent, so spread them across processes.
+            with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=process_pool_context()) as executor:
+                results.update(zip(filing_dirs, executor.map(self._parse_filing, filing_dirs.values())))
+        else:
+            results.update((filing_name, self._parse_filing(filing_path_dir)) for filing_name, filing_path_dir in filing_dirs.items())
         return results
 
     def _parse_filing(self, filing_path_dir: Path) -> Optional[pd.DataFrame]:
         """Parse a single filing directory for XBRL or HTML data."""
-        
-        xbrl_files = list(filing_path_dir.glob("*_htm.xml"))
-        if xbrl_files:
-           
-            return self._parse_xbrl(xbrl_files[0])
+        # One directory read classifies the candidates for both formats (previously two glob passes).
+        xbrl_file: Optional[Path] = None
+        html_files: List[Path] = []
+        with os.scandir(filing_path_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.endswith("_htm.xml"):
+                    if xbrl_file is None:
+                        xbrl_file = Path(entry.path)
+                elif name.endswith(".htm"):
+                    name_lower = name.lower()
+                    if "-index.htm" not in name_lower and "form" not in name_lower:
+                        html_files.append(Path(entry.path))
+
+        if xbrl_file is not None:
+            return self._parse_xbrl(xbrl_file)
 
-       
-        html_files = [
-            f for f in filing_path_dir.glob("*.htm") 
-            if "-index.htm" not in f.name.lower() and "form" not in f.name.lower() 
-        ]
-        
         if html_files:
-           
-            html_files.sort(key=lambda x: len(x.name))
-            if html_files: # Ensure list is not empty after filtering
-                 return self._parse_html(html_files[0])
+            # The shortest name is usually the primary document
+            return self._parse_html(min(html_files, key=lambda x: len(x.name)))
         
         print(f"⚠️ No suitable XBRL or HTML file found for parsing in {filing_path_dir}")
         return None
@@ -72,78 +227,67 @@ class FilingsExtractor:
     def _parse_xbrl(self, file_path: Path) -> Optional[pd.DataFrame]:
         """Parse XBRL financial data."""
         try:
-            
-            parser = etree.XMLParser(recover=True) 
-            tree = etree.parse(str(file_path), parser)
-            root = tree.getroot()
-            
-           
-            ns = dict(root.nsmap) if root.nsmap else {}
-            if None in ns: # Handle default namespace
-                ns['defaultns'] = ns.pop(None)
+            # Stream the instance document in one pass instead of building the whole DOM and
+            # walking it twice; peak memory stays bounded to the element being processed.
+            contexts: Dict[str, Dict[str, Optional[str]]] = {}
+            # Column lists rather than a dict per fact: no per-row key hashing and no column inference in pandas.
+            fact_columns: Dict[str, List[Optional[str]]] = {"name": [], "value": [], "unit": [], "decimals": []}
+            context_refs: List[str] = []
+            local_names: Dict[str, str] = {} # Clark tag -> local name; concepts repeat across many facts
+            interned: Dict[str, str] = {} # Per-parse intern table for repeated attribute values
 
-           
-            ns.setdefault("xbrli", "http://www.xbrl.org/2003/instance")
-            ns.setdefault("us-gaap", "http://fasb.org/us-gaap/2023") 
-            ns.setdefault("dei", "http://xbrl.sec.gov/dei/2023")   
-
-            # Context parsing
-            contexts = {}
-            for context_elem in root.findall(".//xbrli:context", namespaces=ns):
-                context_id = context_elem.get("id")
-                if not context_id:
-                    continue
-                period_elem = context_elem.find(".//xbrli:period", namespaces=ns)
-                if period_elem is None:
-                    contexts[context_id] = {} # Context without period info
+            for _, elem in etree.iterparse(str(file_path), events=("end",), recover=True, huge_tree=True,
+                                              collect_ids=False, remove_comments=True, remove_pis=True):
+                tag = elem.tag
+                if not isinstance(tag, str): # Comments / processing instructions
                     continue
-                
-                contexts[context_id] = {
-                    "startDate": period_elem.findtext("xbrli:startDate", default=None, namespaces=ns),
-                    "endDate": period_elem.findtext("xbrli:endDate", default=None, namespaces=ns),
-                    "instant": period_elem.findtext("xbrli:instant", default=None, namespaces=ns),
-                }
 
-            
-            facts = []
-        
-            for fact_elem in root.xpath("//*[namespace-uri()!='http://www.xbrl.org/2003/instance' and namespace-uri()!='http://www.w3.org/2001/XMLSchema-instance' and text()]", namespaces=ns):
-                if fact_elem.tag.startswith('{http://www.xbrl.org/2003/linkbase}'): # Skip linkbase elements
-                    continue
+                if tag == _XBRLI_CONTEXT_TAG:
+                    context_id = elem.get("id")
+                    if context_id:
+                        period_elem = elem.find(_XBRLI_PERIOD_TAG)
+                        # One walk over the period's children rather than a findtext() path lookup per field.
+                        contexts[context_id] = {} if period_elem is None else { # Context without period info -> {}
+                            _XBRLI_PERIOD_FIELDS[child.tag]: child.text
+                            for child in period_elem
+                            if child.tag in _XBRLI_PERIOD_FIELDS
+                        }
+                elif not tag.startswith(_NON_FACT_NAMESPACE_PREFIXES):
+                    context_ref = elem.get("contextRef")
+                    value_str = elem.text.strip() if elem.text else None
+
+                    if value_str and context_ref:
+                        local_name = local_names.get(tag)
+                        if local_name is None: # Local name without namespace URI, computed once per concept
+                            local_name = local_names[tag] = tag.rpartition("}")[2]
+                        fact_columns["name"].append(local_name)
+                        fact_columns["value"].append(value_str) # Converted to numbers in one vectorised pass below
+                        unit_ref = elem.get("unitRef")
+                        decimals = elem.get("decimals")
+                        # A few dozen distinct units/decimals cover every fact; share one str object each.
+                        fact_columns["unit"].append(interned.setdefault(unit_ref, unit_ref) if unit_ref else None)
+                        fact_columns["decimals"].append(interned.setdefault(decimals, decimals) if decimals else None)
+                        # Contexts may appear after the facts that reference them, so resolve at the end.
+                        context_refs.append(context_ref)
 
-                context_ref = fact_elem.get("contextRef")
-                unit_ref = fact_elem.get("unitRef")
-                decimals = fact_elem.get("decimals")
-                
-                value_str = fact_elem.text.strip() if fact_elem.text else None
-                
-                if value_str and context_ref:
-                    numeric_value: Optional[float] = None
-                    try:
-                        if value_str == "-":
-                            numeric_value = None
-                        else:
-                           
-                            numeric_value = float(value_str.replace(',', '')) 
-                    except ValueError:
-                        
-                        if not value_str.lstrip('-').replace('.', '', 1).isdigit(): 
-                             pass 
-
-                    context_info = contexts.get(context_ref, {})
-                    fact_data = {
-                        "name": etree.QName(fact_elem.tag).localname, # Get local name without namespace URI
-                        "value": numeric_value,
-                        "unit": unit_ref,
-                        "decimals": decimals,
-                        "startDate": context_info.get("startDate"),
-                        "endDate": context_info.get("endDate"),
-                        "instant": context_info.get("instant"),
-                        # "country": context_info.get("country") # Add if relevant
-                    }
-                    facts.append(fact_data)
-
-            return pd.DataFrame(facts) if facts else None
+                # Only release top-level elements (facts and contexts live directly under <xbrl>);
+                # clearing anything deeper would drop a context's period before the context is read.
+                parent = elem.getparent()
+                if parent is not None and parent.getparent() is None:
+                    elem.clear(keep_tail=True)
+                    while elem.getprevious() is not None:
+                        del parent[0]
+
+            if not context_refs:
+                return None
+
+            fact_contexts = [contexts.get(context_ref, {}) for context_ref in context_refs]
+            for period_field in ("startDate", "endDate", "instant"):
+                fact_columns[period_field] = [context_info.get(period_field) for context_info in fact_contexts]
+            df = pd.DataFrame(fact_columns, copy=False)
+            # Non-numeric facts (text blocks, dates, "-") become NaN, as they did with the per-fact float() attempt.
+            df["value"] = pd.to_numeric(df["value"].str.replace(",", "", regex=False), errors="coerce")
+            return df
         except etree.XMLSyntaxError as e:
             print(f"⚠️ XBRL syntax error in {file_path.name}: {str(e)}")
             return None
@@ -154,38 +298,57 @@ class FilingsExtractor:
     def _parse_html(self, file_path: Path) -> Optional[pd.DataFrame]:
         """Parse HTML financial tables. This is a basic implementation."""
         try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
-            
-            soup = BeautifulSoup(content, "html.parser")
-
+            # Stream the document and handle each <table> as soon as it is closed, so only the
+            # current table (not the whole filing) needs to be held as a tree; cells are read
+            # straight from lxml instead of re-serialising each table through pd.read_html.
             all_dfs = []
-            for table_idx, table_tag in enumerate(soup.find_all("table")):
+            # Filings are UTF-8 (as the BeautifulSoup reader assumed); without a declared charset libxml2 would read Latin-1.
+            table_events = etree.iterparse(str(file_path), events=("end",), tag="table", html=True, encoding="utf-8",
+                                           recover=True, huge_tree=True, collect_ids=False)
+            for table_idx, (_, table_elem) in enumerate(table_events):
                 try:
-                  
-                    dfs_from_table = pd.read_html(StringIO(str(table_tag)), flavor='bs4', match='.+') 
-                    if dfs_from_table:
-                        df = dfs_from_table[0] 
-                        df = df.dropna(how="all").reset_index(drop=True) 
-                        df = df.dropna(axis=1, how="all").reset_index(drop=True)
-
-                        if df.empty or not any("$" in str(cell) or "Consolidated" in str(cell) for _, row in df.head(2).iterrows() for cell in row):
-                            if not any(kw in str(table_tag).lower() for kw in ["balance sheet", "income statement", "cash flow", "operations"]):
-                                continue # Skip table if it doesn't look financial
-
-                        # Try to set header if first row looks like one
-                        if not df.empty and any(isinstance(x, str) and (len(x) > 2 or x.isupper()) for x in df.iloc[0]): # Basic header check
-                             if len(df.iloc[0].unique()) > len(df.columns) / 2: # Avoid making data row a header
-                                df.columns = df.iloc[0]
-                                df = df[1:].reset_index(drop=True)
-                        
-                        if not df.empty:
-                            all_dfs.append(df)
-                except ValueError as ve: 
-                    pass # Continue to next table
+                    # Cheap whole-table pre-filter: a table that mentions none of the markers cannot pass the
+                    # checks below, so skip it before reading any cells. The statement keywords are looked
+                    # up in the table's markup (ids, anchors included), as in the final check.
+                    # iterparse yields plain etree elements, which have no lxml.html text_content()
+                    table_text_lower = "".join(table_elem.itertext()).lower()
+                    table_markup_lower = None
+                    if "$" not in table_text_lower and "consolidated" not in table_text_lower:
+                        table_markup_lower = self._table_markup_lower(table_elem)
+                        if not any(kw in table_markup_lower for kw in _FINANCIAL_TABLE_KEYWORDS):
+                            continue
+
+                    df = _read_table(table_elem)
+                    if df is None:
+                        continue
+                    df = df.dropna(how="all").reset_index(drop=True)
+                    df = df.dropna(axis=1, how="all").reset_index(drop=True)
+
+                    # Skip tables that don't look financial
+                    if df.empty or not any("$" in str(cell) or "Consolidated" in str(cell) for row in df.head(2).itertuples(index=False) for cell in row):
+                        if table_markup_lower is None:
+                            table_markup_lower = self._table_markup_lower(table_elem)
+                        if not any(kw in table_markup_lower for kw in _FINANCIAL_TABLE_KEYWORDS):
+                            continue
+
+                    # Try to set header if first row looks like one
+                    if not df.empty and any(isinstance(x, str) and (len(x) > 2 or x.isupper()) for x in df.iloc[0]): # Basic header check
+                         if len(df.iloc[0].unique()) > len(df.columns) / 2: # Avoid making data row a header
+                            df.columns = df.iloc[0]
+                            df = df[1:].reset_index(drop=True)
+                    
+                    if not df.empty:
+                        all_dfs.append(df)
                 except Exception as e:
                     print(f"Error parsing table {table_idx + 1} in {file_path.name}: {e}")
                     continue
+                finally:
+                    # Free outermost tables and everything before them; a nested table is left in
+                    # place because its rows are still part of the enclosing table, which ends later.
+                    if next(table_elem.iterancestors("table"), None) is None:
+                        table_elem.clear(keep_tail=True)
+                        while table_elem.getprevious() is not None:
+                            del table_elem.getparent()[0]
             
             if all_dfs:
                 # For simplicity, concatenate all found "financial-like" tables.
@@ -195,6 +358,10 @@ class FilingsExtractor:
             print(f"⚠️ HTML parsing error in {file_path.name}: {str(e)}")
             return None
 
+    @staticmethod
+    def _table_markup_lower(table_elem) -> str:
+        return etree.tostring(table_elem, encoding="unicode", method="html", with_tail=False).lower()
+
     def save_to_csv(self, ticker: str, data: Dict[str, Optional[pd.DataFrame]],
                     output_dir: str | Path = DEFAULT_EXTRACTOR_OUTPUT_DIRECTORY) -> None:
         """Save extracted data to CSV files."""
@@ -1,346 +1,533 @@
 # src/module1_scraper/fetcher.py
 import os
 import re
+import csv
+import logging
+import shutil
+import time
+import threading
 import requests  
-import json  
-from bs4 import BeautifulSoup
-from typing import List, Tuple, Dict, Any, Optional
+import ujson  # C decoder; submissions JSON runs to several MB of parallel arrays
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree  # type: ignore # lxml might not have stubs by default
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import List, Tuple, Dict, Any, Iterable, Optional
 from pathlib import Path  # Added Path here
+from urllib.parse import urlparse, parse_qs
 
 from sec_analyzer.config import (
     DEFAULT_FILINGS_DIRECTORY,
     DEFAULT_FETCHER_SUPPORTED_FILE_TYPES,
     DEFAULT_FETCHER_IGNORED_KEYWORDS,
+    DEFAULT_FETCHER_MAX_WORKERS,
+    FETCHER_MAX_REQUESTS_PER_SECOND,
+    FETCHER_POOL_CONNECTIONS,
+    FETCHER_POOL_MAXSIZE,
+    MAX_RETRIES,
+    RETRY_DELAY,
     FETCHER_HEADERS,
     FETCHER_BASE_URL,
     FETCHER_SUBMISSIONS_URL,
     FETCHER_TICKER_CIK_MAPPING_URL,
+    FETCHER_TICKER_CACHE_PATH,
+    FETCHER_TICKER_CACHE_TTL,
+    FETCHER_SUBMISSIONS_CACHE_DIRECTORY,
+    FETCHER_SUBMISSIONS_CACHE_TTL,
 )
-from sec_analyzer.utils import sanitize_filename, create_directory
+from sec_analyzer.utils import company_dir, sanitize_filename, create_directory
+
+logger = logging.getLogger(__name__)
+
+# lxml parsers are not thread-safe, so each worker thread keeps (and reuses) its own HTMLParser.
+_HTML_PARSER_LOCAL = threading.local()
+# R1.htm, R2.htm, ... are EDGAR's rendered XBRL views; index.json lists them but the filing index page does not.
+_RENDERED_REPORT_RE = re.compile(r"^R\d+\.htm$", re.IGNORECASE)
+
+
+def _get_html_parser() -> etree.HTMLParser:
+    """Return this thread's HTML parser, creating it on first use."""
+    parser = getattr(_HTML_PARSER_LOCAL, "parser", None)
+    if parser is None:
+        parser = _HTML_PARSER_LOCAL.parser = etree.HTMLParser()
+    return parser
 
 
 class FilingsFetcher:
     def __init__(self,
                  filings_directory: str = DEFAULT_FILINGS_DIRECTORY,
                  supported_file_types: List[str] = DEFAULT_FETCHER_SUPPORTED_FILE_TYPES,
-                 ignored_keywords: List[str] = DEFAULT_FETCHER_IGNORED_KEYWORDS) -> None:
+                 ignored_keywords: List[str] = DEFAULT_FETCHER_IGNORED_KEYWORDS,
+                 max_workers: int = DEFAULT_FETCHER_MAX_WORKERS) -> None:
         self.filings_directory_path = Path(filings_directory)  # Store as Path object
+        self.max_workers = max_workers  # Concurrent SEC requests during get_filings
         # Ensure supported_file_types is a tuple for string methods like .endswith
         self.supported_file_types_tuple = tuple(st.lower() for st in supported_file_types)
-        self.ignored_keywords_lower = [kw.lower() for kw in ignored_keywords]
+        self.ignored_keywords_lower = frozenset(kw.lower() for kw in ignored_keywords)
+        # One C-level match per file name instead of a Python loop over the suffix tuple
+        self._supported_file_re = re.compile(
+            "(?:" + "|".join(re.escape(st) for st in self.supported_file_types_tuple) + ")$", re.IGNORECASE)
+        # Likewise one case-insensitive search for any ignored keyword, without lowercasing the name first
+        # ("(?!)" never matches, so an empty keyword list ignores nothing.)
+        self._ignored_keyword_re = re.compile(
+            "|".join(re.escape(kw) for kw in sorted(self.ignored_keywords_lower)) or "(?!)", re.IGNORECASE)
+
+        self.session = self._build_session(max_workers)
+        self._throttle_lock = threading.Lock()
+        self._min_request_interval = 1.0 / FETCHER_MAX_REQUESTS_PER_SECOND
+        self._next_request_time = 0.0
+        self._ticker_map: Optional[Dict[str, str]] = None  # {TICKER: 10-digit CIK}, loaded lazily
+
+    @staticmethod
+    def _build_session(max_workers: int = DEFAULT_FETCHER_MAX_WORKERS) -> requests.Session:
+        """Create a keep-alive session that pools connections and backs off on 429/5xx."""
+        session = requests.Session()
+        session.headers.update(FETCHER_HEADERS)  # Includes gzip Accept-Encoding and keep-alive
+        retry = Retry(
+            total=MAX_RETRIES,
+            backoff_factor=RETRY_DELAY,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+            respect_retry_after_header=True,
+        )
+        # Every worker thread must be able to keep its connection in the pool; otherwise urllib3
+        # discards the overflow and those threads pay a fresh TCP+TLS handshake per request.
+        pool_maxsize = max(FETCHER_POOL_MAXSIZE, max_workers)
+        adapter = HTTPAdapter(pool_connections=FETCHER_POOL_CONNECTIONS, pool_maxsize=pool_maxsize, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _throttle(self) -> None:
+        """Space out requests across all worker threads to stay under the SEC rate limit."""
+        with self._throttle_lock:
+            now = time.monotonic()
+            wait = self._next_request_time - now
+            self._next_request_time = max(now, self._next_request_time) + self._min_request_interval
+        if wait > 0:
+            time.sleep(wait)
+
+    def _request(self, url: str, **kwargs: Any) -> requests.Response:
+        """Rate-limited GET through the pooled session. Raises HTTPError for 4xx/5xx."""
+        self._throttle()
+        response = self.session.get(url, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def _get_cached(self, url: str, cache_path: Path, ttl: float, description: str) -> bytes:
+        """Return the body of url, served from cache_path while that copy is younger than ttl seconds.
+
+        If a refresh fails, a stale cached copy is used rather than failing the fetch.
+        """
+        try:
+            if time.time() - cache_path.stat().st_mtime < ttl:
+                return cache_path.read_bytes()
+        except FileNotFoundError:
+            pass
+
+        try:
+            content = self._request(url, timeout=20).content
+        except requests.exceptions.RequestException:
+            if not cache_path.exists():
+                raise
+            logger.warning(f"Failed to refresh {description}; falling back to the stale cached copy.")
+            return cache_path.read_bytes()
+
+        create_directory(cache_path.parent)
+        tmp_path = cache_path.with_name(cache_path.name + f".{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, cache_path)  # Atomic, so readers never see a partial file
+        return content
+
+    def _load_ticker_map(self) -> Dict[str, str]:
+        """Load the ticker->CIK map, using the on-disk copy while it is younger than FETCHER_TICKER_CACHE_TTL."""
+        if self._ticker_map is not None:
+            return self._ticker_map
+
+        raw_mapping = self._get_cached(FETCHER_TICKER_CIK_MAPPING_URL, Path(FETCHER_TICKER_CACHE_PATH),
+                                       FETCHER_TICKER_CACHE_TTL, "ticker-CIK mapping")
+        self._ticker_map = {
+            str(company_info["ticker"]).upper(): str(company_info["cik_str"]).zfill(10)
+            for company_info in ujson.loads(raw_mapping).values()
+            if isinstance(company_info, dict) and "ticker" in company_info and "cik_str" in company_info
+        }
+        return self._ticker_map
 
     def get_cik_from_ticker(self, ticker: str) -> Optional[str]:
         """Get CIK number from stock ticker symbol."""
         try:
-            response = requests.get(FETCHER_TICKER_CIK_MAPPING_URL, headers=FETCHER_HEADERS)
-            response.raise_for_status()
-            ticker_map_data = response.json()
-
-            for _key, company_info in ticker_map_data.items():  # Iterate through dict items
-                if isinstance(company_info, dict) and company_info.get("ticker", "").upper() == ticker.upper():
-                    return str(company_info["cik_str"]).zfill(10)
-            print(f"Ticker '{ticker.upper()}' not found in SEC mapping.")
-            return None
+            cik = self._load_ticker_map().get(ticker.upper())
+            if cik is None:
+                logger.warning(f"Ticker '{ticker.upper()}' not found in SEC mapping.")
+            return cik
         except requests.exceptions.RequestException as e:
-            print(f"Failed to fetch ticker-CIK mapping: {e}")
+            logger.warning(f"Failed to fetch ticker-CIK mapping: {e}")
             return None
-        except json.JSONDecodeError as e:
-            print(f"Failed to decode ticker-CIK mapping JSON: {e}")
+        except ValueError as e:  # ujson signals malformed JSON with ValueError
+            logger.warning(f"Failed to decode ticker-CIK mapping JSON: {e}")
             return None
         except Exception as e:  # Catch any other unexpected error during mapping
-            print(f"An unexpected error occurred while getting CIK for ticker {ticker}: {e}")
+            logger.warning(f"An unexpected error occurred while getting CIK for ticker {ticker}: {e}")
             return None
 
     def _get_metadata(self, cik: str, company_name_for_log: str) -> Optional[Dict[str, Any]]:
         """Get the metadata by CIK. Expects a 10-digit zero-padded CIK."""
         if not (cik.isdigit() and len(cik) == 10):
-            print(f"Error: _get_metadata received an invalid CIK: {cik}. Must be 10 digits.")
+            logger.warning(f"Error: _get_metadata received an invalid CIK: {cik}. Must be 10 digits.")
             return None
         try:
             # URL requires the 10-digit zero-padded CIK.
             # FETCHER_SUBMISSIONS_URL is "https://data.sec.gov/submissions/CIK{}.json"
             url = FETCHER_SUBMISSIONS_URL.format(cik)
 
-            print(f"\nFetching metadata for {company_name_for_log} (CIK: {cik}) from {url}...")
+            logger.info(f"\nFetching metadata for {company_name_for_log} (CIK: {cik}) from {url}...")
 
-            response = requests.get(url, headers=FETCHER_HEADERS, timeout=20)  # Added timeout
-            response.raise_for_status()  # Raises HTTPError for 4xx/5xx
-            return response.json()
+            cache_path = Path(FETCHER_SUBMISSIONS_CACHE_DIRECTORY) / f"CIK{cik}.json"
+            content = self._get_cached(url, cache_path, FETCHER_SUBMISSIONS_CACHE_TTL,
+                                       f"submissions for CIK {cik}")  # Raises HTTPError for 4xx/5xx
+            return ujson.loads(content)
         except requests.exceptions.HTTPError as e:
-            print(f"Metadata fetch HTTP error for CIK {cik} from {url}: {e}")
+            logger.warning(f"Metadata fetch HTTP error for CIK {cik} from {url}: {e}")
             if e.response is not None:
-                print(
+                logger.warning(
                     f"Response status: {e.response.status_code}, Response text: {e.response.text[:500]}...")  # Show some response
             return None
         except requests.exceptions.RequestException as e:  # Other network errors
-            print(f"Metadata fetch network error for CIK {cik} from {url}: {e}")
+            logger.warning(f"Metadata fetch network error for CIK {cik} from {url}: {e}")
             return None
-        except json.JSONDecodeError as e:
-            print(f"Metadata JSON decode error for CIK {cik} from {url}: {e}")
+        except ValueError as e:
+            logger.warning(f"Metadata JSON decode error for CIK {cik} from {url}: {e}")
             return None
 
-    def _get_accession_numbers(self, metadata: Dict[str, Any], years: Optional[List[int]], num_filings: int) -> List[
+    def _get_accession_numbers(self, metadata: Dict[str, Any], years: Optional[Iterable[int | str]], num_filings: int) -> List[
         Tuple[str, str]]:
         """Extracts the relevant accession numbers from the retrieved metadata."""
         if not metadata or "filings" not in metadata or "recent" not in metadata["filings"]:
-            print("Debug: Metadata is missing 'filings' or 'filings.recent' keys.")
+            logger.debug("Debug: Metadata is missing 'filings' or 'filings.recent' keys.")
             return []
 
         metadata_recent = metadata["filings"]["recent"]
         required_keys = ["accessionNumber", "form", "reportDate"]
         for key in required_keys:
             if key not in metadata_recent:
-                print(f"Debug: Metadata 'filings.recent' is missing key: '{key}'")
+                logger.debug(f"Debug: Metadata 'filings.recent' is missing key: '{key}'")
                 return []
             if not isinstance(metadata_recent[key], list):
-                print(f"Debug: Metadata key '{key}' is not a list.")
+                logger.debug(f"Debug: Metadata key '{key}' is not a list.")
                 return []
             if len(metadata_recent[key]) != len(metadata_recent["accessionNumber"]):
-                print(f"Debug: Metadata key '{key}' has inconsistent length with 'accessionNumber'.")
+                logger.debug(f"Debug: Metadata key '{key}' has inconsistent length with 'accessionNumber'.")
                 return []
 
         if not metadata_recent["accessionNumber"]:
-            print("Debug: 'filings.recent.accessionNumber' is empty. No recent filings to process.")
+            logger.debug("Debug: 'filings.recent.accessionNumber' is empty. No recent filings to process.")
             return []
 
-        filings_data = zip(
-            metadata_recent["accessionNumber"],
-            metadata_recent["form"],
-            metadata_recent["reportDate"]
-        )
+        # Compare 4-char year prefixes as strings so the filter skips an isdigit()/int() per filing.
+        # None means "any year"; an empty collection matches no filing.
+        years_set = None if years is None else frozenset(str(year) for year in years)
 
         match_expression = lambda form_type, report_date_str: (
                 form_type == "10-K" and
-                (years is None or (
-                            report_date_str and len(report_date_str) >= 4 and report_date_str[:4].isdigit() and int(
-                        report_date_str[:4]) in years))
+                (years_set is None or (report_date_str and report_date_str[:4] in years_set))
         )
 
-        filtered_accessions = []
-        processed_filing_count = 0
-        matched_filing_count = 0
-
-        for acc_number, form_type, report_date_str in filings_data:
-            processed_filing_count += 1
-            if matched_filing_count >= num_filings:
-                break
-
-            if match_expression(form_type, report_date_str):
-                accession_dashed = str(acc_number)  # Should already be string from JSON
-                accession_clean = accession_dashed.replace("-", "")
-                filtered_accessions.append((accession_dashed, accession_clean))
-                matched_filing_count += 1
+        # Lazily walk the parallel lists once and stop as soon as num_filings matches are found.
+        matching_accessions = (
+            (accession_dashed, accession_dashed.replace("-", ""))
+            for accession_dashed, form_type, report_date_str in zip(
+                metadata_recent["accessionNumber"],
+                metadata_recent["form"],
+                metadata_recent["reportDate"],
+            )
+            if match_expression(form_type, report_date_str)
+        )
+        filtered_accessions = list(islice(matching_accessions, max(num_filings, 0)))
 
         if not filtered_accessions:
-            print("Debug: No 10-K filings matched the criteria from the recent filings list.")
-            print(f"Debug: Years filter was: {years}")
-            print(f"Debug: Processed {processed_filing_count} entries from metadata_recent.")
-            print(f"Debug: Desired number of filings was: {num_filings}")
-            print("Debug: First few entries from metadata_recent it iterated over (up to 5):")
+            logger.debug("Debug: No 10-K filings matched the criteria from the recent filings list.")
+            logger.debug(f"Debug: Years filter was: {years}")
+            logger.debug(f"Debug: Processed {len(metadata_recent['accessionNumber'])} entries from metadata_recent.")
+            logger.debug(f"Debug: Desired number of filings was: {num_filings}")
+            logger.debug("Debug: First few entries from metadata_recent it iterated over (up to 5):")
             for i in range(min(5, len(metadata_recent["accessionNumber"]))):
                 acc = metadata_recent['accessionNumber'][i]
                 form = metadata_recent['form'][i]
                 date_val = metadata_recent['reportDate'][i]
                 should_match = match_expression(form, date_val)
-                print(
+                logger.debug(
                     f"  - acc: {acc}, form: {form}, date: {date_val} (Should match for 10-K in {years}? {'Yes' if should_match else 'No'})")
 
         return filtered_accessions
 
-    def _get_file_index(self, index_url: str, accession_dashed: str, index_file_path_str: str) -> List[Dict[str, str]]:
-        """Creates a index.csv file and returns the filing file information in dict format."""
-        file_index_list: List[Dict[str, str]] = []
-        try:
-            print(f"    Fetching file index: {index_url}")
-            response = requests.get(index_url, headers=FETCHER_HEADERS, timeout=20)
-            response.raise_for_status()
-
-            index_file_path = Path(index_file_path_str)
-            create_directory(index_file_path.parent)
-
-            with open(index_file_path, "w", encoding="utf-8") as f:
-                f.write("\"File Name\",\"File URL\"\n")
-                f.write(f"\"Index URL\",\"{index_url}\"\n")
-
-                soup = BeautifulSoup(response.content, "html.parser")
-                table = soup.find("table", class_="tableFile")  # Main table with files
-                links_to_check_from_table = []
-                if table:
-                    links_to_check_from_table = table.find_all("a", href=True)
-
-
-                all_potential_links = soup.find_all("a", href=True)
+    def _is_wanted_file(self, file_name: str) -> bool:
+        """Checks a filing document name against the supported types and ignored keywords."""
+        if not self._supported_file_re.search(file_name) or _RENDERED_REPORT_RE.match(file_name):
+            return False
+        return not self._ignored_keyword_re.search(file_name)
 
-                # Combine and unique-ify links by href to avoid processing duplicates
-                combined_links_map: Dict[str, Any] = {}  # Store link tag by href
-                for link_tag in links_to_check_from_table + all_potential_links:
-                    href = link_tag.get("href")
-                    if href and href not in combined_links_map:
-                        combined_links_map[href] = link_tag
+    def _get_file_index(self, filing_base_url: str, accession_dashed: str, index_file_path_str: str) -> List[Dict[str, str]]:
+        """Creates a index.csv file from EDGAR's index.json listing and returns the filing file information.
 
-                processed_urls = set()
+        Falls back to scraping the HTML filing index page if index.json is unavailable.
+        """
+        # Accepted EDGAR filings never change, so a manifest from an earlier run is still accurate.
+        cached_file_index = self._read_index_manifest(Path(index_file_path_str))
+        if cached_file_index is not None:
+            logger.info(f"    Reusing file index from previous run: {index_file_path_str}")
+            return cached_file_index
 
-                for original_href, link in combined_links_map.items():
-                    href_to_process = original_href
-                    is_ixbrl_doc = False
+        index_url = f"{filing_base_url}/index.json"
+        try:
+            logger.info(f"    Fetching file index: {index_url}")
+            directory_items = ujson.loads(self._request(index_url, timeout=20).content)["directory"]["item"]
+            file_index_list = [
+                {"file_name": item["name"], "full_url": f"{filing_base_url}/{item['name']}"}
+                for item in directory_items
+                if self._is_wanted_file(item["name"])
+            ]
+        except (requests.exceptions.RequestException, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"    index.json unavailable for {accession_dashed} ({e}); falling back to the HTML index page.")
+            return self._get_file_index_html(f"{filing_base_url}/{accession_dashed}-index.htm", accession_dashed, index_file_path_str)
+
+        self._write_index_manifest(Path(index_file_path_str), index_url, file_index_list)
+        return file_index_list
+
+    def _get_file_index_html(self, index_url: str, accession_dashed: str, index_file_path_str: str) -> List[Dict[str, str]]:
+        """Creates a index.csv file from the HTML filing index page and returns the filing file information."""
+        file_index_list: List[Dict[str, str]] = []
+        try:
+            logger.info(f"    Fetching file index: {index_url}")
+            response = self._request(index_url, timeout=20)
 
+            root = etree.fromstring(response.content, _get_html_parser())
 
-                    if href_to_process.startswith("/ix?doc="):
+            # Unique-ify links by href to avoid processing duplicates
+            combined_links_map: Dict[str, Any] = {}  # Store link element by href
+            for link_tag in root.iterfind(".//a[@href]"):
+                href = link_tag.get("href")
+                if href and href not in combined_links_map:
+                    combined_links_map[href] = link_tag
 
-                        try:
+            processed_urls = set()
 
-                            from urllib.parse import urlparse, parse_qs
-                            parsed_ix_url = urlparse(href_to_process)
-                            doc_param = parse_qs(parsed_ix_url.query).get('doc')
-                            if doc_param and doc_param[0]:
-                                href_to_process = doc_param[
-                                    0]
-                                is_ixbrl_doc = True
+            for original_href, link in combined_links_map.items():
+                href_to_process = original_href
 
-                            else:
-                                print(f"    Warning: Could not parse 'doc' from iXBRL link: {original_href}")
-                                continue
-                        except Exception as e_parse:
-                            print(f"    Warning: Error parsing iXBRL link {original_href}: {e_parse}")
-                            continue
 
+                if href_to_process.startswith("/ix?doc="):
 
-                    file_name = os.path.basename(href_to_process)
-                    if not file_name:
+                    try:
+                        parsed_ix_url = urlparse(href_to_process)
+                        doc_param = parse_qs(parsed_ix_url.query).get('doc')
+                        if doc_param and doc_param[0]:
+                            href_to_process = doc_param[0]
 
-                        link_text_name = sanitize_filename(link.get_text(strip=True))
-                        if link_text_name and any(
-                                link_text_name.lower().endswith(st) for st in self.supported_file_types_tuple):
-                            file_name = link_text_name
                         else:
-
-                            continue
-
-                    # File type and keyword filtering
-                    if (not file_name.lower().endswith(self.supported_file_types_tuple) or
-                            any(kw in file_name.lower() for kw in self.ignored_keywords_lower) or
-                            file_name.lower() == f"{accession_dashed.lower()}-index.htm"):
-
-                        if file_name.lower() == f"{accession_dashed.lower()}-index.htm" and not is_ixbrl_doc:
-
+                            logger.warning(f"    Warning: Could not parse 'doc' from iXBRL link: {original_href}")
                             continue
-                        elif not file_name.lower().endswith(self.supported_file_types_tuple):
+                    except Exception as e_parse:
+                        logger.warning(f"    Warning: Error parsing iXBRL link {original_href}: {e_parse}")
+                        continue
 
-                            continue
 
+                file_name = os.path.basename(href_to_process)
+                if not file_name:
 
-                    full_url: str
-                    if href_to_process.startswith("/Archives/"):
-                        full_url = f"https://www.sec.gov{href_to_process}"
-                    elif href_to_process.startswith("http://") or href_to_process.startswith("https://"):
-                        full_url = href_to_process
-                    elif href_to_process.startswith("/"):
-                        full_url = f"https://www.sec.gov{href_to_process}"
+                    link_text_name = sanitize_filename("".join(link.itertext()).strip())
+                    if link_text_name and self._supported_file_re.search(link_text_name):
+                        file_name = link_text_name
                     else:
-                        base_of_index_url = index_url.rsplit('/', 1)[0]
-                        full_url = f"{base_of_index_url}/{href_to_process}"
-
 
-                    if full_url in processed_urls:
                         continue
-                    processed_urls.add(full_url)
 
-                    f.write(f"\"{file_name}\",\"{full_url}\"\n")
-                    file_index_list.append({
-                        "file_name": file_name,
-                        "full_url": full_url
-                    })
+                # File type and keyword filtering ("-index.htm" is an ignored keyword, so this also drops the index page itself)
+                if not self._is_wanted_file(file_name):
+                    continue
+
+                full_url: str
+                if href_to_process.startswith("/Archives/"):
+                    full_url = f"https://www.sec.gov{href_to_process}"
+                elif href_to_process.startswith("http://") or href_to_process.startswith("https://"):
+                    full_url = href_to_process
+                elif href_to_process.startswith("/"):
+                    full_url = f"https://www.sec.gov{href_to_process}"
+                else:
+                    base_of_index_url = index_url.rsplit('/', 1)[0]
+                    full_url = f"{base_of_index_url}/{href_to_process}"
+
+
+                if full_url in processed_urls:
+                    continue
+                processed_urls.add(full_url)
+
+                file_index_list.append({
+                    "file_name": file_name,
+                    "full_url": full_url
+                })
+            self._write_index_manifest(Path(index_file_path_str), index_url, file_index_list)
             return file_index_list
         except requests.exceptions.RequestException as e:
-            print(f"    Failed to download index page {index_url}: {e}")
+            logger.warning(f"    Failed to download index page {index_url}: {e}")
             return file_index_list
         except Exception as e:
-            print(f"    An unexpected error occurred in _get_file_index for {index_url}: {e}")
+            logger.warning(f"    An unexpected error occurred in _get_file_index for {index_url}: {e}")
             return file_index_list
 
+    @staticmethod
+    def _write_index_manifest(index_file_path: Path, index_url: str, file_index_list: List[Dict[str, str]]) -> None:
+        """Writes the index.csv manifest for a filing in a single buffered pass. The filing directory must exist."""
+        with open(index_file_path, "w", encoding="utf-8", buffering=1 << 16) as f:
+            f.write("\"File Name\",\"File URL\"\n")
+            f.write(f"\"Index URL\",\"{index_url}\"\n")
+            f.writelines(f"\"{info['file_name']}\",\"{info['full_url']}\"\n" for info in file_index_list)
+            # One durable sync per filing, for the manifest only; downloaded files rely on the close-time
+            # flush so the kernel can coalesce their writeback.
+            f.flush()
+            os.fsync(f.fileno())
+
+    @staticmethod
+    def _read_index_manifest(index_file_path: Path) -> Optional[List[Dict[str, str]]]:
+        """Reads back an index.csv written by _write_index_manifest, or returns None if there is no usable one."""
+        try:
+            with open(index_file_path, "r", encoding="utf-8", newline="") as f:
+                rows = list(csv.reader(f))
+        except (FileNotFoundError, UnicodeDecodeError, csv.Error):
+            return None
+        # Header row plus the "Index URL" row; an empty file list is not worth trusting over a fresh fetch.
+        if len(rows) < 3 or rows[1][:1] != ["Index URL"]:
+            return None
+        return [{"file_name": row[0], "full_url": row[1]} for row in rows[2:] if len(row) == 2]
+
     def _get_file(self, url: str, file_path_str: str) -> bool:
-        """Downloads a file if it doesn't already exist."""
+        """Downloads a file if it doesn't already exist. The parent directory is created by get_filings."""
         file_path_obj = Path(file_path_str)
         if file_path_obj.exists() and file_path_obj.stat().st_size > 0:  # Check if not empty
-            print(f"      File exists and is not empty: {file_path_obj.name}")
+            logger.info(f"      File exists and is not empty: {file_path_obj.name}")
             return True
+        # Stream into a sibling .part file so an interrupted download is never mistaken
+        # for a complete one by the exists-and-non-empty check above.
+        part_path = file_path_obj.with_name(file_path_obj.name + ".part")
         try:
-            print(f"      Downloading: {file_path_obj.name} from {url}")
-            with requests.get(url, headers=FETCHER_HEADERS, stream=True, timeout=30) as response:
-                response.raise_for_status()
-                # Ensure parent directory exists before writing
-                create_directory(file_path_obj.parent)
-                with open(file_path_obj, "wb") as file_handle:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        file_handle.write(chunk)
+            logger.info(f"      Downloading: {file_path_obj.name} from {url}")
+            with self._request(url, stream=True, timeout=30) as response:
+                response.raw.decode_content = True  # Undo gzip transfer-encoding while streaming
+                # Copy in bounded 1 MiB blocks so multi-MB XBRL instances never sit fully in memory.
+                with open(part_path, "wb", buffering=0) as file_handle:
+                    shutil.copyfileobj(response.raw, file_handle, length=1 << 20)
+            os.replace(part_path, file_path_obj)
             return True
         except requests.exceptions.RequestException as e:
-            print(f"      Failed to download {url}: {e}")
-            if file_path_obj.exists():
-                try:
-                    file_path_obj.unlink(missing_ok=True)  # Python 3.8+
-                except TypeError:  # For older Python if missing_ok not available
-                    if file_path_obj.exists(): file_path_obj.unlink()
+            logger.warning(f"      Failed to download {url}: {e}")
+            part_path.unlink(missing_ok=True)
             return False
         except Exception as e:
-            print(f"      An unexpected error occurred in _get_file for {url}: {e}")
+            logger.warning(f"      An unexpected error occurred in _get_file for {url}: {e}")
+            part_path.unlink(missing_ok=True)
             return False
 
-    def get_filings(self, cik: str, ticker: Optional[str], years: Optional[List[int]], num_filings: int = 4) -> None:
+    def _submit_download(self, executor: ThreadPoolExecutor, inflight_downloads: Dict[str, Tuple[Future, str]],
+                         url: str, file_path_str: str) -> Future:
+        """Schedules a download, coalescing URLs already requested in this run into a local copy of the first download."""
+        if url in inflight_downloads:
+            source_future, source_path_str = inflight_downloads[url]
+            return executor.submit(self._copy_downloaded_file, source_future, source_path_str, file_path_str)
+        future = executor.submit(self._get_file, url, file_path_str)
+        inflight_downloads[url] = (future, file_path_str)
+        return future
+
+    @staticmethod
+    def _copy_downloaded_file(source_future: Future, source_path_str: str, file_path_str: str) -> bool:
+        """Waits for a download of the same URL and copies its result instead of fetching it again."""
+        # The source download was submitted first, so it is already running on (or finished by) another worker.
+        if not source_future.result():
+            return False
+        if source_path_str == file_path_str:
+            return True
+        try:
+            shutil.copyfile(source_path_str, file_path_str)
+            return True
+        except OSError as e:
+            logger.warning(f"      Failed to copy {source_path_str} to {file_path_str}: {e}")
+            return False
+
+    def get_filings(self, cik: str, ticker: Optional[str], years: Optional[Iterable[int | str]], num_filings: int = 4) -> None:
         """Handles the filing extraction/download process."""
 
         if not (cik.isdigit() and len(cik) == 10):
             raise ValueError(f"Invalid CIK provided to get_filings: '{cik}'. Must be a 10-digit number.")
 
         company_name_for_log = ticker if ticker else f"CIK_{cik}"
-        safe_company_dirname = sanitize_filename(company_name_for_log)
 
         metadata = self._get_metadata(cik, company_name_for_log)
         if not metadata:
-            print(f"Failed to retrieve or parse metadata for {company_name_for_log}. Download process cannot start.")
+            logger.warning(f"Failed to retrieve or parse metadata for {company_name_for_log}. Download process cannot start.")
             return
 
         accession_numbers = self._get_accession_numbers(metadata, years, num_filings)
         if not accession_numbers:
-            print(
+            logger.info(
                 f"No matching filings found for {company_name_for_log} (CIK: {cik}) based on the criteria. Download process will not start.")
             return
 
-        print(f"Found {len(accession_numbers)} filing(s) to process for {company_name_for_log}.")
+        logger.info(f"Found {len(accession_numbers)} filing(s) to process for {company_name_for_log}.")
         download_attempted_count = 0
+        cik_stripped_for_path = cik.lstrip("0")  # Used for edgar/data/... URLs
 
+        # One mkdir for the (sanitized) company root, then a single mkdir per filing below it.
+        company_root = create_directory(company_dir(company_name_for_log, self.filings_directory_path))
+        filings_to_process: List[Tuple[str, str, Path]] = []
         for accession_dashed, accession_clean in accession_numbers:
-            cik_stripped_for_path = cik.lstrip("0")  # Used for edgar/data/... URLs
-
             filing_base_url = f"{FETCHER_BASE_URL}/{cik_stripped_for_path}/{accession_clean}"
-            index_url = f"{filing_base_url}/{accession_dashed}-index.htm"
-
-            company_filing_dir = self.filings_directory_path / safe_company_dirname / accession_dashed
-            create_directory(company_filing_dir)
-
-            index_file_path_str = str(company_filing_dir / "index.csv")
-
-            print(f"  Processing filing: {accession_dashed} (Index: {index_url})")
-
-            files_to_download = self._get_file_index(index_url, accession_dashed, index_file_path_str)
-            if not files_to_download:
-                print(f"    No downloadable files found or index fetch failed for {accession_dashed}.")
-                continue
-
-            download_attempted_count += 1  # Considered an attempt if we get files to download
 
-            for file_info in files_to_download:
-                file_path_str = str(
-                    company_filing_dir / sanitize_filename(file_info["file_name"]))  # Sanitize downloaded filename
-                if not self._get_file(file_info["full_url"], file_path_str):
-                    print(f"    Failed to download: {file_info['file_name']} for filing {accession_dashed}")
-            print(f"  Finished processing files for filing: {accession_dashed}")
+            company_filing_dir = company_root / accession_dashed
+            company_filing_dir.mkdir(exist_ok=True)
+            filings_to_process.append((accession_dashed, filing_base_url, company_filing_dir))
+
+        # Downloads are I/O bound, so overlapping the SEC round-trips on a bounded
+        # thread pool makes N requests cost ~max(latency) instead of sum(latency).
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Consumed lazily: each filing's downloads are queued as soon as its own index arrives,
+            # overlapping with the index fetches still in flight for later filings.
+            file_indexes = executor.map(
+                lambda filing: self._get_file_index(filing[1], filing[0], str(filing[2] / "index.csv")),
+                filings_to_process,
+            )
+
+            pending_downloads: Dict[str, List[Tuple[Dict[str, str], Future]]] = {}
+            # full_url -> (download future, destination path) for every URL submitted in this run
+            inflight_downloads: Dict[str, Tuple[Future, str]] = {}
+            for (accession_dashed, filing_base_url, company_filing_dir), files_to_download in zip(filings_to_process, file_indexes):
+                logger.info(f"  Processing filing: {accession_dashed} ({filing_base_url})")
+                if not files_to_download:
+                    logger.warning(f"    No downloadable files found or index fetch failed for {accession_dashed}.")
+                    continue
+
+                download_attempted_count += 1  # Considered an attempt if we get files to download
+
+                pending_downloads[accession_dashed] = [
+                    (file_info, self._submit_download(
+                        executor,
+                        inflight_downloads,
+                        file_info["full_url"],
+                        str(company_filing_dir / sanitize_filename(file_info["file_name"])),  # Sanitize downloaded filename
+                    ))
+                    for file_info in files_to_download
+                ]
+
+            for accession_dashed, downloads in pending_downloads.items():
+                # _get_file already logs the reason for each failed download.
+                failed_count = sum(1 for _, future in downloads if not future.result())
+                if failed_count:
+                    logger.warning(f"    {failed_count} of {len(downloads)} file(s) failed to download for filing {accession_dashed}")
+                logger.info(f"  Finished processing files for filing: {accession_dashed}")
 
         if download_attempted_count > 0:
-            print(f"\n✅ Download process completed for {download_attempted_count} filing(s) of {company_name_for_log}.")
-            print(f"   Filings should be in subdirectories under: {self.filings_directory_path / safe_company_dirname}")
+            logger.info(f"\n✅ Download process completed for {download_attempted_count} filing(s) of {company_name_for_log}.")
+            logger.info(f"   Filings should be in subdirectories under: {company_dir(company_name_for_log, self.filings_directory_path)}")
         elif accession_numbers:  # We found accession numbers but didn't attempt downloads (e.g. all index fetches failed)
-            print(
+            logger.info(
                 f"\n⚠️ Found {len(accession_numbers)} filings but failed to process their file indexes for {company_name_for_log}.")
         # If accession_numbers was empty, the message is handled earlier.
 
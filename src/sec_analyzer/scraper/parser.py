@@ -1,15 +1,120 @@
 # src/module1_scraper/parser.py
 import os
 import re
-import json
+import ujson  # C encoder; parsed sections are large string payloads
+import threading
 from pathlib import Path
-from bs4 import BeautifulSoup
-from typing import List, Tuple, Dict, Any
-from sec_analyzer.config import DEFAULT_FILINGS_DIRECTORY, DEFAULT_EXTRACTOR_OUTPUT_DIRECTORY
+from lxml import etree # type: ignore # lxml might not have stubs by default
+from lxml import html as lxml_html # type: ignore
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Tuple, Dict, Any, Optional
+from sec_analyzer.config import DEFAULT_FILINGS_DIRECTORY, DEFAULT_EXTRACTOR_OUTPUT_DIRECTORY, DEFAULT_PARSE_MAX_WORKERS
+from sec_analyzer.utils import process_pool_context
+
+# lxml parsers are not thread-safe, so each thread keeps (and reuses) its own HTMLParser.
+_HTML_PARSER_LOCAL = threading.local()
+
+
+def _get_html_parser() -> lxml_html.HTMLParser:
+    """Return this thread's HTML parser, creating it on first use."""
+    parser = getattr(_HTML_PARSER_LOCAL, "parser", None)
+    if parser is None:
+        # Filings are read as UTF-8 (libxml2 would assume Latin-1 without a declared charset); no ID table
+        # (nothing here looks elements up by id) and no comment nodes to strip later.
+        parser = _HTML_PARSER_LOCAL.parser = lxml_html.HTMLParser(encoding="utf-8", remove_comments=True, collect_ids=False)
+    return parser
+
+
+def _extract_text(file_path: str | Path) -> str:
+    """Return the visible text of a filing, one stripped text node per line."""
+    file_path = os.fspath(file_path)
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(file_path)
+    # Hand libxml2 the path so it reads the file natively in chunks; the document is never
+    # materialised as a Python bytes/str, and no Python-level read buffers are allocated.
+    root = lxml_html.parse(file_path, _get_html_parser()).getroot()
+    if root is None: # Empty document
+        return ""
+    # Scripts and styles are not part of the visible text (comments are dropped by the parser).
+    etree.strip_elements(root, "script", "style", with_tail=False)
+    return "\n".join(stripped for stripped in (t.strip() for t in root.itertext()) if stripped)
+
+
+# Each section runs from the line that starts its heading up to (not including) the first later line
+# starting the next item, or to the end of the text. One search in the C regex engine replaces a
+# Python loop doing two re.match calls per line. [^\S\n] keeps headings confined to a single line.
+_HSPACE = r"[^\S\n]"
+_ITEM_8_SECTION_RE = re.compile(
+    rf"^{_HSPACE}*ITEM{_HSPACE}+8(?:{_HSPACE}|[\-–.:])*FINANCIAL STATEMENTS.*?(?=^{_HSPACE}*ITEM{_HSPACE}+9|\Z)",
+    re.IGNORECASE | re.MULTILINE | re.DOTALL,
+)
+_ITEM_1A_SECTION_RE = re.compile(
+    rf"^{_HSPACE}*ITEM{_HSPACE}+1A(?:{_HSPACE}|[\-–.:])*RISK FACTORS.*?(?=^{_HSPACE}*ITEM{_HSPACE}+(?:1B|2)|\Z)",
+    re.IGNORECASE | re.MULTILINE | re.DOTALL,
+)
+
+# Financial statement subsection titles, combined into one alternation with a named group per
+# subsection. Only match starts are used, so SHAREHOLDERS...EQUITY matches lazily to keep scanning.
+_SUBSECTION_TITLE_PATTERNS = {
+    "operations": r"CONSOLIDATED STATEMENTS OF OPERATIONS",
+    "comprehensive_income": r"CONSOLIDATED STATEMENTS OF COMPREHENSIVE INCOME",
+    "balance_sheet": r"CONSOLIDATED BALANCE SHEETS",
+    "shareholders_equity": r"CONSOLIDATED STATEMENTS OF SHAREHOLDERS.*?EQUITY", # .*? for flexibility
+    "cash_flows": r"CONSOLIDATED STATEMENTS OF CASH FLOWS",
+    "notes": r"Notes to Consolidated Financial Statements",
+}
+_SUBSECTION_TITLES_RE = re.compile(
+    "|".join(f"(?P<{name}>{pattern})" for name, pattern in _SUBSECTION_TITLE_PATTERNS.items()),
+    re.IGNORECASE,
+)
+_SUBSECTION_TITLE_COUNT = len(_SUBSECTION_TITLE_PATTERNS)
+
+# Below this many files, issuing read-ahead hints costs more syscalls than it saves.
+_PREFETCH_MIN_FILES = 16
+
+
+def _prefetch_files(file_paths: List[Path]) -> None:
+    """Ask the kernel to start reading every file now, so the parse workers find them in the page cache."""
+    if len(file_paths) < _PREFETCH_MIN_FILES or not hasattr(os, "posix_fadvise"): # Not available on Windows/macOS
+        return
+    for file_path in file_paths:
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+        except OSError:
+            continue # The parse step reports unreadable files
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _write_json_array(items: Iterable[Dict[str, Any]], output_file: str | Path) -> int:
+    """Write items to output_file as an indented JSON array as they arrive; returns how many were written.
+
+    Only one item is held at a time, instead of the whole list of parsed filings.
+    """
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True) # Ensure parent directory exists
+    count = 0
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write("[")
+        for item in items:
+            # Same layout as json.dump(items, f, indent=2): each element indented one level inside the array.
+            # JSON strings escape newlines, so every newline in the dump is a layout newline.
+            item_json = ujson.dumps(item, indent=2, escape_forward_slashes=False).replace("\n", "\n  ")
+            f.write(f"{',' if count else ''}\n  {item_json}")
+            count += 1
+        f.write("\n]" if count else "]")
+    return count
+
 
 class FilingParser:
-    def __init__(self, filings_directory: str = DEFAULT_FILINGS_DIRECTORY):
+    def __init__(self, filings_directory: str = DEFAULT_FILINGS_DIRECTORY,
+                 max_workers: Optional[int] = DEFAULT_PARSE_MAX_WORKERS):
         self.filings_directory = Path(filings_directory)
+        self.max_workers = max_workers  # Worker processes for the *_all_filings methods (None -> os.cpu_count())
         self.supported_file_types = ('.htm', '.html', '.txt')
         self.section_patterns = [
             r"ITEM\s+8[\s\-–]+Financial Statements",
@@ -24,35 +129,9 @@ class FilingParser:
 
     def parse_section(self, file_path: str | Path) -> str | None:
         try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
-                soup = BeautifulSoup(content, "html.parser")
-
-
-            text = soup.get_text(separator="\n", strip=True)
-            lines = text.splitlines()
-
-            start_idx = None
-            end_idx = None
-
-            # Regex updated for more robustness and case-insensitivity
-            item_8_pattern = re.compile(r"ITEM\s+8[\s\-–.:]*FINANCIAL STATEMENTS", re.IGNORECASE)
-            item_9_pattern = re.compile(r"ITEM\s+9[\sA-Z\.–.:]*", re.IGNORECASE) # Matches ITEM 9, ITEM 9A, ITEM 9. etc.
-
-
-            for i, line in enumerate(lines):
-                if start_idx is None and item_8_pattern.match(line.strip()):
-                    start_idx = i
-                elif start_idx is not None and item_9_pattern.match(line.strip()):
-                    end_idx = i
-                    break
-            
-            if start_idx is not None:
-                section_lines = lines[start_idx:end_idx] if end_idx is not None else lines[start_idx:]
-                return "\n".join(section_lines).strip()
-            
-           
-            return None 
+            text = _extract_text(file_path)
+            match = _ITEM_8_SECTION_RE.search(text)
+            return match.group(0).strip() if match else None
 
         except FileNotFoundError:
             print(f"File not found: {file_path}")
@@ -64,33 +143,9 @@ class FilingParser:
     def parse_risk_factors(self, file_path: str | Path) -> str | None:
         """Extract Item 1A: Risk Factors section from filing."""
         try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
-                soup = BeautifulSoup(content, "html.parser")
-
-            text = soup.get_text(separator="\n", strip=True)
-            lines = text.splitlines()
-
-            start_idx = None
-            end_idx = None
-
-            # Regex patterns for finding risk factors section
-            item_1a_pattern = re.compile(r"ITEM\s+1A[\s\-–.:]*RISK FACTORS", re.IGNORECASE)
-            item_1b_pattern = re.compile(r"ITEM\s+1B[\sA-Z\.–.:]*", re.IGNORECASE)
-            item_2_pattern = re.compile(r"ITEM\s+2[\sA-Z\.–.:]*", re.IGNORECASE)
-
-            for i, line in enumerate(lines):
-                if start_idx is None and item_1a_pattern.match(line.strip()):
-                    start_idx = i
-                elif start_idx is not None and (item_1b_pattern.match(line.strip()) or item_2_pattern.match(line.strip())):
-                    end_idx = i
-                    break
-
-            if start_idx is not None:
-                section_lines = lines[start_idx:end_idx] if end_idx is not None else lines[start_idx:]
-                return "\n".join(section_lines).strip()
-
-            return None
+            text = _extract_text(file_path)
+            match = _ITEM_1A_SECTION_RE.search(text)
+            return match.group(0).strip() if match else None
 
         except FileNotFoundError:
             print(f"File not found: {file_path}")
@@ -99,22 +154,36 @@ class FilingParser:
             print(f"Unexpected error parsing risk factors from {file_path}: {e}")
             return None
 
+    def _collect_supported_files(self, ticker_filings_path: Path) -> List[Path]:
+        """Walk the ticker's directory once and return every supported file, sorted by path."""
+        # os.walk splits files from directories using the type bits of its scandir() pass,
+        # so no per-file stat is needed (rglob + is_file() stats every entry).
+        return sorted(
+            Path(dir_path) / file_name
+            for dir_path, _, file_names in os.walk(ticker_filings_path)
+            for file_name in file_names
+            if os.path.splitext(file_name)[1].lower() in self.supported_file_types
+        )
+
+    def _map_files(self, parse_func: Callable[[Path], str | None], file_paths: List[Path]) -> Iterator[str | None]:
+        """Apply parse_func to every file, in order, spreading the CPU-bound parsing across processes."""
+        if len(file_paths) <= 1:
+            yield from map(parse_func, file_paths)
+            return
+        _prefetch_files(file_paths)
+        with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=process_pool_context()) as executor:
+            # Yielded in order as they complete; each result is released once the caller moves on.
+            yield from executor.map(parse_func, file_paths)
+
     @staticmethod
     def split_subsections(text: str) -> dict[str, str]:
-        sections = {
-            "operations": r"CONSOLIDATED STATEMENTS OF OPERATIONS",
-            "comprehensive_income": r"CONSOLIDATED STATEMENTS OF COMPREHENSIVE INCOME",
-            "balance_sheet": r"CONSOLIDATED BALANCE SHEETS",
-            "shareholders_equity": r"CONSOLIDATED STATEMENTS OF SHAREHOLDERS.*EQUITY", # Added .* for flexibility
-            "cash_flows": r"CONSOLIDATED STATEMENTS OF CASH FLOWS",
-            "notes": r"Notes to Consolidated Financial Statements",
-        }
         results = {}
-        # Use re.IGNORECASE for robustness in finding subsection titles
-        for name, pattern in sections.items():
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                results[name] = match.start()
+        # One left-to-right scan finds the first occurrence of every subsection title
+        # instead of a separate re.search over the whole text per title.
+        for match in _SUBSECTION_TITLES_RE.finditer(text):
+            results.setdefault(match.lastgroup, match.start())
+            if len(results) == _SUBSECTION_TITLE_COUNT:
+                break
         
         sorted_items = sorted(results.items(), key=lambda x: x[1])
         structured = {}
@@ -127,89 +196,66 @@ class FilingParser:
         if not ticker_filings_path.exists():
             raise FileNotFoundError(f"Directory {ticker_filings_path} not found")
 
-        # Count matching files within the specific ticker's directory
-        total_files = sum(
-            1 for file_path in ticker_filings_path.rglob('*') # Iterate within specific_filings_path
-            if file_path.is_file() and
-            file_path.suffix.lower() in self.supported_file_types
-        )
+        file_paths = self._collect_supported_files(ticker_filings_path)
+        total_files = len(file_paths)
         if total_files == 0:
             print(f"No supported files found in {ticker_filings_path} to parse.")
             # Create an empty JSON file or handle as preferred
-            with open(output_file, "w", encoding="utf-8") as f:
-                json.dump([], f, indent=2)
+            _write_json_array([], output_file)
             print(f"✅ Saved empty result to {output_file}")
             return
 
         print(f"⏳ Parsing {total_files} filings from {ticker_filings_path}...")
 
-        parsed_data = []
-        processed_files = 0
-
-        # Process files from the specific ticker's directory
-        for file_path in ticker_filings_path.rglob('*'): # Iterate within specific_filings_path
-            if file_path.is_file() and file_path.suffix.lower() in self.supported_file_types:
-                processed_files += 1
-                print(f"📄 [{processed_files}/{total_files}] Processing: {file_path.name}")
+        def parsed_documents() -> Iterator[Dict[str, Any]]:
+            # Process files from the specific ticker's directory
+            for processed_files, (file_path, section_text) in enumerate(
+                zip(file_paths, self._map_files(self.parse_section, file_paths)), start=1
+            ):
+                print(f"📄 [{processed_files}/{total_files}] Processed: {file_path.name}")
 
-                section_text = self.parse_section(file_path)
                 if section_text:
-                    parsed_data.append({
+                    yield {
                         "file": str(file_path), # Storing relative or absolute path might be a choice
                         "sections": self.split_subsections(section_text)
-                    })
+                    }
                 else:
                     print(f"    No 'ITEM 8' section found in {file_path.name}")
 
-
-        # Save results
-        output_file = Path(output_file) # Ensure it's a Path object
-        output_file.parent.mkdir(parents=True, exist_ok=True) # Ensure parent directory exists
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(parsed_data, f, indent=2)
-        print(f"✅ Saved {len(parsed_data)} parsed documents to {output_file}")
+        # Save results as they are parsed
+        saved = _write_json_array(parsed_documents(), output_file)
+        print(f"✅ Saved {saved} parsed documents to {output_file}")
 
     def parse_risk_factors_all_filings(self, ticker_filings_path: Path, output_file: str | Path) -> None:
         """Parse risk factors from all filings for a ticker and save to JSON."""
         if not ticker_filings_path.exists():
             raise FileNotFoundError(f"Directory {ticker_filings_path} not found")
 
-        # Count matching files
-        total_files = sum(
-            1 for file_path in ticker_filings_path.rglob('*')
-            if file_path.is_file() and
-            file_path.suffix.lower() in self.supported_file_types
-        )
+        file_paths = self._collect_supported_files(ticker_filings_path)
+        total_files = len(file_paths)
         if total_files == 0:
             print(f"No supported files found in {ticker_filings_path} to parse.")
-            with open(output_file, "w", encoding="utf-8") as f:
-                json.dump([], f, indent=2)
+            _write_json_array([], output_file)
             print(f"✅ Saved empty result to {output_file}")
             return
 
         print(f"⏳ Parsing risk factors from {total_files} filings from {ticker_filings_path}...")
 
-        parsed_risk_factors = []
-        processed_files = 0
-
-        for file_path in ticker_filings_path.rglob('*'):
-            if file_path.is_file() and file_path.suffix.lower() in self.supported_file_types:
-                processed_files += 1
-                print(f"📄 [{processed_files}/{total_files}] Processing: {file_path.name}")
+        def parsed_risk_factors() -> Iterator[Dict[str, Any]]:
+            for processed_files, (file_path, risk_factors_text) in enumerate(
+                zip(file_paths, self._map_files(self.parse_risk_factors, file_paths)), start=1
+            ):
+                print(f"📄 [{processed_files}/{total_files}] Processed: {file_path.name}")
 
-                risk_factors_text = self.parse_risk_factors(file_path)
                 if risk_factors_text:
-                    parsed_risk_factors.append({
+                    yield {
                         "file": str(file_path),
                         "risk_factors": risk_factors_text
-                    })
+                    }
                     print(f"    ✅ Found risk factors")
                 else:
                     print(f"    ❌ No risk factors found")
 
-        # Save results
-        output_file = Path(output_file)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(parsed_risk_factors, f, indent=2)
-        print(f"✅ Saved {len(parsed_risk_factors)} risk factor documents to {output_file}")
\ No newline at end of file
+        # Save results as they are parsed
+        saved = _write_json_array(parsed_risk_factors(), output_file)
+        print(f"✅ Saved {saved} risk factor documents to {output_file}")
@@ -7,18 +7,22 @@ This module contains helper functions for:
 - Data validation and cleaning (years, financial values)
 - Network operations (retry decorator)
 - Text processing (chunking, hashing)
+- Process pools
 """
 
 import hashlib
+import multiprocessing
 import os
 import re
 import time
-from functools import wraps
+from functools import lru_cache, wraps
 from pathlib import Path
 from typing import Any, Callable, List, Optional
 
 import requests
 
+from sec_analyzer.config import DEFAULT_FILINGS_DIRECTORY
+
 # It's good practice to import constants from a central config
 # to avoid circular dependencies if utils were ever imported by config.
 # For now, defining them here is fine if they are only for the retry decorator.
@@ -28,16 +32,21 @@ RETRY_DELAY = 1.5  # Seconds
 
 # --- Filesystem and Path Helpers ---
 
+# Any run of characters outside [\w-.] (and any run of underscores) collapses to a single '_'.
+_UNSAFE_FILENAME_CHARS_RE = re.compile(r'(?:[^\w\-.]|_)+')
+
 def sanitize_filename(name: str) -> str:
     """Sanitize strings for safe filesystem use."""
     if not isinstance(name, str):
         name = str(name)  # Ensure it's a string
-    name = name.strip()
-    name = re.sub(r'[^\w\-_.]', '_', name)
-    name = re.sub(r'_+', '_', name)
-    name = name.strip('_')
+    name = _UNSAFE_FILENAME_CHARS_RE.sub('_', name.strip()).strip('_')
     return name if name else "_sanitized_empty_name_"
 
+@lru_cache(maxsize=1024)
+def company_dir(ticker: str, filings_directory: str | Path = DEFAULT_FILINGS_DIRECTORY) -> Path:
+    """Return the directory holding a company's downloaded filings (<filings_directory>/<sanitized ticker>)."""
+    return Path(filings_directory) / sanitize_filename(ticker)
+
 def create_directory(path: str | Path) -> Path:
     """Create directory if it does not exist."""
     path_obj = Path(path)
@@ -124,6 +133,20 @@ def handle_retry(max_retries: int = MAX_RETRIES, delay: float = RETRY_DELAY) ->
     return decorator
 
 
+# --- Process Pool Helpers ---
+
+def process_pool_context() -> multiprocessing.context.BaseContext:
+    """Start method for CPU-bound worker pools: never fork.
+
+    The CLI runs a logging QueueListener thread (and requests' connection pools hold locks), and a forked
+    child inherits any lock another thread held at that moment, which can deadlock it. forkserver starts
+    workers from a clean single-threaded server; spawn is the fallback where it is unavailable (Windows).
+    """
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    )
+
+
 # --- Text Processing Helpers ---
 
 def chunk_text(text: str, max_length: int = 1000, overlap: int = 100) -> List[str]:
@@ -143,13 +166,8 @@ def chunk_text(text: str, max_length: int = 1000, overlap: int = 100) -> List[st
     if overlap < 0 or overlap >= max_length:
         raise ValueError("overlap must be >= 0 and < max_length")
 
-    chunks: List[str] = []
-    start = 0
-    while start < len(text):
-        end = min(start + max_length, len(text))
-        chunks.append(text[start:end])
-        start += (max_length - overlap)
-    return chunks
+    # Window starts are a plain range; slicing already clamps the last window to the end of the text.
+    return [text[start:start + max_length] for start in range(0, len(text), max_length - overlap)]
 
 def hash_text(s: str) -> str:
     """Generate a stable SHA256 hash for a string, useful for deduplication."""
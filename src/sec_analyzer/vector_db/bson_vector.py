@@ -0,0 +1,25 @@
+from __future__ import annotations
+from typing import Any
+
+import numpy as np
+from bson.binary import Binary
+
+# No sec_analyzer imports here: search_service (imported by module3 as src.sec_analyzer...) depends on this
+# module, and an absolute import would load a second copy of the package under another name.
+
+# BSON binary vector (subtype 9): a dtype byte (0x27 = float32) and a padding byte, then little-endian
+# float32 values. Atlas Vector Search indexes it like an array of doubles at under half the size.
+BSON_VECTOR_SUBTYPE = 9
+BSON_VECTOR_FLOAT32_HEADER = b"\x27\x00"
+
+
+def encode_float32_vector(values: np.ndarray) -> Binary:
+    """Pack a 1-D little-endian float32 array as a BSON float32 vector."""
+    return Binary(BSON_VECTOR_FLOAT32_HEADER + values.tobytes(), BSON_VECTOR_SUBTYPE)
+
+
+def decode_stored_embedding(value: Any) -> np.ndarray:
+    """Return a stored chunk embedding as a float32 array, whether it was saved as a BSON vector or a list."""
+    if isinstance(value, Binary) and value.subtype == BSON_VECTOR_SUBTYPE:
+        return np.frombuffer(value, dtype="<f4", offset=len(BSON_VECTOR_FLOAT32_HEADER))
+    return np.asarray(value, dtype=np.float32)
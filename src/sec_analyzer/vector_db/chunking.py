@@ -1,49 +1,76 @@
 from __future__ import annotations
-import json
 from typing import List
 import pandas as pd
+import ujson
 
 from sec_analyzer.utils import chunk_text
 
 
-def process_csv_original_method(csv_path: str, chunk_size: int = 512, overlap: int = 50) -> List[str]:
+def _load_csv(csv_path: str | pd.DataFrame) -> pd.DataFrame:
+    """Read the CSV, or pass through a frame the caller already loaded so several strategies can share one read."""
+    if isinstance(csv_path, pd.DataFrame):
+        return csv_path
+    return pd.read_csv(csv_path, keep_default_na=False)
+
+
+def _join_row_values(df: pd.DataFrame) -> List[str]:
+    """Space-join every row's values as strings, one vectorised column concatenation at a time."""
+    if df.empty:
+        return []
+    columns = [df[column].astype(str) for column in df.columns]
+    combined = columns[0]
+    for column in columns[1:]:
+        combined = combined + " " + column
+    return combined.tolist()
+
+
+def process_csv_original_method(csv_path: str | pd.DataFrame, chunk_size: int = 512, overlap: int = 50) -> List[str]:
     """Merge the entire CSV into one string, then chunk."""
-    df = pd.read_csv(csv_path, keep_default_na=False)
-    df["combined"] = df.apply(lambda row: " ".join(row.astype(str)), axis=1)
-    full_text = " ".join(df["combined"].tolist())
+    df = _load_csv(csv_path)
+    full_text = " ".join(_join_row_values(df))
     chunks = chunk_text(full_text, max_length=chunk_size, overlap=overlap)
     return chunks
 
 
-def process_csv_to_natural_language(csv_path: str) -> List[str]:
+# (column, text before the value, text after the value) for each sentence fragment, in order
+_NATURAL_LANGUAGE_PARTS = (
+    ("name", "the metric is '", "'"),
+    ("value", "its value is ", ""),
+    ("unit", "with unit '", "'"),
+    ("endDate", "as of ", ""),
+)
+
+
+def process_csv_to_natural_language(csv_path: str | pd.DataFrame) -> List[str]:
     """Convert each CSV row to a compact natural-language sentence."""
-    df = pd.read_csv(csv_path, keep_default_na=False)
-    chunks: List[str] = []
-    for _, row in df.iterrows():
-        parts = []
-        name = row.get("name")
-        value = row.get("value")
-        unit = row.get("unit")
-        end_date = row.get("endDate")
-        if name: parts.append(f"the metric is '{name}'")
-        if value: parts.append(f"its value is {value}")
-        if unit: parts.append(f"with unit '{unit}'")
-        if end_date: parts.append(f"as of {end_date}")
-        if len(parts) > 1:
-            chunks.append("For a financial record, " + ", ".join(parts) + ".")
-    return chunks
+    df = _load_csv(csv_path)
+    if df.empty:
+        return []
+
+    # Build every row's sentence column by column instead of materialising a Series per row.
+    sentences = pd.Series("", index=df.index, dtype=object)
+    part_counts = pd.Series(0, index=df.index)
+    for column, prefix, suffix in _NATURAL_LANGUAGE_PARTS:
+        if column not in df.columns:
+            continue
+        present = df[column].astype(bool)  # Same truthiness as the per-row `if value:` checks
+        separators = part_counts.gt(0).map({True: ", ", False: ""})
+        fragments = separators + prefix + df[column].astype(str) + suffix
+        sentences = sentences.where(~present, sentences + fragments)
+        part_counts += present
+
+    return ("For a financial record, " + sentences[part_counts > 1] + ".").tolist()
 
 
-def process_csv_to_raw_string(csv_path: str) -> List[str]:
+def process_csv_to_raw_string(csv_path: str | pd.DataFrame) -> List[str]:
     """Use each CSV row as a raw string chunk."""
-    df = pd.read_csv(csv_path, keep_default_na=False)
-    df["combined"] = df.apply(lambda row: " ".join(row.astype(str)), axis=1)
-    return df["combined"].tolist()
+    df = _load_csv(csv_path)
+    return _join_row_values(df)
 
 
 def get_text_from_parsed_json(json_path: str) -> str:
     with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+        data = ujson.load(f)
     blobs = []
     for parsed_file in data:
         for _section_name, section_text in parsed_file.get("sections", {}).items():
@@ -1,29 +1,143 @@
 from __future__ import annotations
 import os
-from typing import List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Set, Tuple
 
 import torch
-from pymongo import UpdateOne, MongoClient
+from pymongo.errors import BulkWriteError, OperationFailure
 
 from sec_analyzer.schemas import Filing
 from sec_analyzer.utils import hash_text
+from sec_analyzer.vector_db.bson_vector import encode_float32_vector
+from sec_analyzer.vector_db.mongo import get_mongo_client
 
 EMBED_DIM = int(os.getenv("EMBED_DIM", "384"))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+# Padded tokens per forward pass (batch rows x longest row); 0 disables the cap
+EMBED_MAX_TOKENS = int(os.getenv("EMBED_MAX_TOKENS", "8192"))
+_DUPLICATE_KEY_ERROR = 11000
+_INDEX_OPTIONS_CONFLICT = 85
+_INDEX_KEY_SPECS_CONFLICT = 86
+CONTENT_HASH_INDEX_NAME = "content_hash_unique"
+# Lookups repeat this condition so the server can answer them from the partial index.
+_CONTENT_HASH_FILTER = {"content_hash": {"$type": "string"}}
+_INDEXED_COLLECTIONS: Set[str] = set()
+_INDEXED_COLLECTIONS_LOCK = threading.Lock()
 
 
-def _get_collection():
-    client = MongoClient(os.getenv("MONGODB_URI"))
+def _get_collection(collection_name: Optional[str] = None):
+    client = get_mongo_client()
     db = client[os.getenv("DB_NAME")]
-    return db[os.getenv("COLLECTION_NAME", "embedded_chunks")]
+    return db[collection_name or os.getenv("COLLECTION_NAME", "embedded_chunks")]
 
 
-def calculate_embeddings_from_chunks(model, tokenizer, chunks: List[str]) -> torch.Tensor:
-    encoded_input = tokenizer(chunks, padding=True, truncation=True, return_tensors='pt')
-    with torch.no_grad():
-        model_output = model(**encoded_input)
-        cls_embeddings = model_output[0][:, 0]
+def _ensure_content_hash_index(collection) -> None:
+    """Create the unique content_hash index once per collection and process, replacing older plain ones.
+
+    Chunks are deduplicated on content hash by this index; documents without a hash are exempt. It has its
+    own name because a plain index on content_hash (default name content_hash_1) may already exist, and
+    asking for different options under that name, or for the same keys under a new name, is rejected.
+    """
+    with _INDEXED_COLLECTIONS_LOCK:
+        if collection.full_name in _INDEXED_COLLECTIONS:
+            return
+        indexes = collection.index_information()
+        if CONTENT_HASH_INDEX_NAME not in indexes:
+            plain_indexes = [name for name, info in indexes.items() if info["key"] == [("content_hash", 1)]]
+
+            def create():
+                collection.create_index(
+                    "content_hash", name=CONTENT_HASH_INDEX_NAME, unique=True,
+                    partialFilterExpression=_CONTENT_HASH_FILTER,
+                )
+
+            try:
+                create()
+            except OperationFailure as e:
+                if e.code not in (_INDEX_OPTIONS_CONFLICT, _INDEX_KEY_SPECS_CONFLICT) or not plain_indexes:
+                    raise
+                # The server will not keep two indexes on the same key; drop the plain one and retry.
+                for name in plain_indexes:
+                    collection.drop_index(name)
+                plain_indexes = []
+                create()
+            # The unique index serves every content_hash lookup, so a remaining plain index only slows writes.
+            for name in plain_indexes:
+                collection.drop_index(name)
+        _INDEXED_COLLECTIONS.add(collection.full_name)
+
+
+def select_chunks_to_embed(chunks: List[str], collection_name: Optional[str] = None) -> List[str]:
+    """Drop repeated chunks and chunks whose content hash is already stored, keeping the original order.
+
+    Stored documents keep their embeddings, so only the returned chunks need a forward pass.
+    """
+    unique_chunks = list(dict.fromkeys(chunks))
+    content_hashes = [hash_text(chunk) for chunk in unique_chunks]
+    collection = _get_collection(collection_name)
+    _ensure_content_hash_index(collection)
+    stored_hashes = set(collection.distinct("content_hash", {"content_hash": {"$in": content_hashes, "$type": "string"}}))
+    return [chunk for chunk, content_hash in zip(unique_chunks, content_hashes) if content_hash not in stored_hashes]
+
+
+def _token_budget_batches(order: List[int], lengths: List[int], batch_size: int, max_tokens: Optional[int]) -> List[List[int]]:
+    """Split length-sorted chunk indices into batches of at most batch_size chunks and max_tokens padded tokens."""
+    batches: List[List[int]] = []
+    batch: List[int] = []
+    for i in order:
+        # Sorted ascending, so chunk i sets the padded length of the batch it joins
+        if batch and (len(batch) == batch_size or (max_tokens and (len(batch) + 1) * lengths[i] > max_tokens)):
+            batches.append(batch)
+            batch = []
+        batch.append(i)
+    batches.append(batch)
+    return batches
+
+
+def _collate_batch(tokenizer, encoded: dict, batch: List[int], pin_memory: bool) -> dict:
+    padded = tokenizer.pad({key: [values[i] for i in batch] for key, values in encoded.items()}, return_tensors='pt')
+    # Page-locked host memory lets the copy to the GPU run asynchronously (non_blocking below)
+    return {key: value.pin_memory() if pin_memory else value for key, value in padded.items()}
+
+
+def calculate_embeddings_from_chunks(
+    model,
+    tokenizer,
+    chunks: List[str],
+    batch_size: int = EMBED_BATCH_SIZE,
+    max_tokens: Optional[int] = EMBED_MAX_TOKENS,
+) -> torch.Tensor:
+    if not chunks:
+        return torch.empty((0, EMBED_DIM))
+    device = model.device
+    on_cuda = device.type == "cuda"
+    # Tokenize everything in one unpadded call to get real token counts, then length-bucket on them so
+    # little compute goes to padding. max_tokens caps padded tokens per batch, keeping memory use steady
+    # whether a filing has short XBRL facts or long merged paragraphs.
+    encoded = tokenizer(chunks, truncation=True)
+    lengths = [len(ids) for ids in encoded["input_ids"]]
+    order = sorted(range(len(chunks)), key=lengths.__getitem__)
+    batches = _token_budget_batches(order, lengths, batch_size, max_tokens)
+
+    batch_embeddings = []
+    # Pad the next batch on a worker thread while the current one runs through the model;
+    # outputs stay on the device until the end.
+    with ThreadPoolExecutor(max_workers=1) as executor, torch.inference_mode(), \
+            torch.autocast(device_type=device.type, dtype=torch.bfloat16, enabled=on_cuda):
+        pending = executor.submit(_collate_batch, tokenizer, encoded, batches[0], on_cuda)
+        for next_batch in batches[1:] + [None]:
+            encoded_input = pending.result()
+            if next_batch is not None:
+                pending = executor.submit(_collate_batch, tokenizer, encoded, next_batch, on_cuda)
+            encoded_input = {key: value.to(device, non_blocking=True) for key, value in encoded_input.items()}
+            model_output = model(**encoded_input)
+            batch_embeddings.append(model_output[0][:, 0].float())
+
+    cls_embeddings = torch.empty((len(chunks), batch_embeddings[0].shape[1]), device=device)
+    cls_embeddings[torch.tensor(order, device=device)] = torch.cat(batch_embeddings)  # Back to input order
     embeddings = torch.nn.functional.normalize(cls_embeddings, p=2, dim=1)
-    return embeddings
+    return embeddings.cpu()
 
 
 def insert_filing_with_embeddings(
@@ -31,30 +145,40 @@ def insert_filing_with_embeddings(
     chunks: List[str],
     embeddings: torch.Tensor,
     collection_name: Optional[str] = None,
-):
+) -> Tuple[int, int]:
+    """Insert one document per chunk and return (inserted, skipped as duplicates)."""
     assert embeddings.shape[0] == len(chunks), "embeddings and chunks size mismatch"
     assert embeddings.shape[1] == EMBED_DIM, f"Embedding dim {embeddings.shape[1]} != expected {EMBED_DIM}"
 
-    collection = _get_collection() if collection_name is None else MongoClient(os.getenv("MONGODB_URI"))[os.getenv("DB_NAME")][collection_name]
-
-    bulk_ops = []
-    for i, chunk in enumerate(chunks):
-        doc = Filing(
-            cik=filing.cik,
-            ticker=filing.ticker,
-            filing_type=filing.filing_type,
-            year=filing.year,
-            source=filing.source,
-            text_chunk=chunk,
-            embedding=embeddings[i].cpu().numpy().tolist(),
-        ).to_mongo()
-        # Deduplicate on content hash
-        content_hash = hash_text(doc["text_chunk"]) if doc.get("text_chunk") else None
-        filter_q = {"content_hash": content_hash} if content_hash else {"text_chunk": doc["text_chunk"]}
-        doc["content_hash"] = content_hash
-
-        bulk_ops.append(UpdateOne(filter_q, {"$setOnInsert": doc}, upsert=True))
-
-    if not bulk_ops:
-        return None
-    return collection.bulk_write(bulk_ops)
\ No newline at end of file
+    collection = _get_collection(collection_name)
+    _ensure_content_hash_index(collection)
+
+    # One shared set of filing fields and a single tensor -> float32 array conversion for the whole batch.
+    base = {
+        "cik": filing.cik,
+        "ticker": filing.ticker,
+        "filing_type": filing.filing_type,
+        "year": filing.year,
+        "source": filing.source,
+    }
+    embedding_rows = embeddings.cpu().numpy().astype("<f4", copy=False)
+    docs = [
+        {
+            **base,
+            "text_chunk": chunk,
+            "embedding": encode_float32_vector(embedding),
+            "content_hash": hash_text(chunk) if chunk else None,
+        }
+        for chunk, embedding in zip(chunks, embedding_rows)
+    ]
+
+    if not docs:
+        return 0, 0
+    # Unordered: the server keeps inserting past duplicate-key errors, all in one round trip.
+    try:
+        return len(collection.insert_many(docs, ordered=False).inserted_ids), 0
+    except BulkWriteError as e:
+        write_errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != _DUPLICATE_KEY_ERROR for error in write_errors):
+            raise
+        return e.details.get("nInserted", 0), len(write_errors)
@@ -1,11 +1,31 @@
 from __future__ import annotations
+import os
 from functools import lru_cache
+
+import torch
 from transformers import AutoTokenizer, AutoModel
 
+EMBED_COMPILE = os.getenv("EMBED_COMPILE", "").lower() in ("1", "true", "yes")
+
 
 @lru_cache(maxsize=1)
 def load_model_and_tokenizer(model_name: str):
     model = AutoModel.from_pretrained(model_name)
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)  # Rust `tokenizers` implementation
     model.eval()
+    # Encoder inference is compute-bound; use the GPU when there is one. Callers send inputs to model.device.
+    model.to("cuda" if torch.cuda.is_available() else "cpu")
+    if model.device.type == "cuda" and torch.cuda.is_bf16_supported():
+        # Callers already run the encoder under bf16 autocast on CUDA; bf16 weights halve their memory
+        # traffic and skip the per-op weight casts. Pooled outputs are still cast back to fp32.
+        model.to(torch.bfloat16)
+    elif model.device.type == "cpu" and os.getenv("EMBED_INT8", "").lower() in ("1", "true", "yes"):
+        # Opt-in: int8 dynamic quantisation of the Linear layers (VNNI int8 kernels on modern x86).
+        # Vectors shift slightly, so ingest and query should use the same setting.
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if EMBED_COMPILE:
+        # Opt-in: fuse the encoder's kernels. Compilation costs seconds up front (SECRAGService.setup pays it
+        # with a warm-up query), so it pays off on long sessions and ingests. One graph with dynamic shapes serves
+        # every batch size and sequence length, so inputs need no padding beyond the longest row.
+        model = torch.compile(model, dynamic=True)
     return model, tokenizer
\ No newline at end of file
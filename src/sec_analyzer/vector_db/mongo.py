@@ -0,0 +1,40 @@
+from __future__ import annotations
+import os
+import threading
+from typing import Dict, Optional
+
+from pymongo import MongoClient
+
+# One client per URI for the whole process: a MongoClient is thread-safe and owns the connection pool,
+# so sharing it saves a TLS handshake and server discovery for every extra client.
+_CLIENTS: Dict[str, MongoClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+MONGO_CLIENT_OPTIONS = {
+    "maxPoolSize": 32,
+    "minPoolSize": 4,  # Keep a few connections warm for interactive queries
+    "serverSelectionTimeoutMS": 3000,  # Fail fast instead of the 30 s default when the cluster is unreachable
+    "retryReads": True,
+    # Wire compression for top-k chunk payloads. zlib is in the standard library; zstd/snappy would need
+    # extra packages, and pymongo warns on every new client when a listed compressor is missing.
+    "compressors": "zlib",
+}
+
+
+def get_mongo_client(uri: Optional[str] = None) -> MongoClient:
+    """Return the shared client for uri (default: $MONGODB_URI), creating it on first use."""
+    uri = uri or os.getenv("MONGODB_URI")
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(uri)
+        if client is None:
+            client = _CLIENTS[uri] = MongoClient(uri, **MONGO_CLIENT_OPTIONS)
+        return client
+
+
+def close_mongo_client(uri: Optional[str] = None) -> None:
+    """Close and forget the shared client for uri; a later get_mongo_client call opens a new one."""
+    uri = uri or os.getenv("MONGODB_URI")
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.pop(uri, None)
+    if client is not None:
+        client.close()
@@ -1,30 +1,38 @@
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any, List
 
 import torch
 from pymongo.collection import Collection
+from pymongo.errors import OperationFailure
 
+# Relative imports: module3 imports this module as src.sec_analyzer...
+from .bson_vector import decode_stored_embedding
 
-def generate_embedding(text: str, model, tokenizer) -> List[float]:
-    encoded_input = tokenizer(text, padding=True, truncation=True, return_tensors='pt')
-    with torch.no_grad():
+
+def generate_embeddings(texts: List[str], model, tokenizer) -> List[List[float]]:
+    """Embed several query texts in one tokenizer call and one forward pass."""
+    device = model.device
+    encoded_input = tokenizer(texts, padding=True, truncation=True, return_tensors='pt').to(device)
+    # Same precision as ingest (calculate_embeddings_from_chunks): bf16 on CUDA, pooled output back in fp32
+    with torch.inference_mode(), torch.autocast(device_type=device.type, dtype=torch.bfloat16, enabled=device.type == "cuda"):
         model_output = model(**encoded_input)
-        embedding = model_output[0][:, 0]
-    normalized = torch.nn.functional.normalize(embedding, p=2, dim=1)
-    return normalized.squeeze().tolist()
+        embeddings = model_output[0][:, 0].float()
+    normalized = torch.nn.functional.normalize(embeddings, p=2, dim=1)
+    return normalized.cpu().tolist()
 
 
-def vector_search_with_filter(
-    collection: Collection,
-    index_name: str,
-    query_text: str,
-    model,
-    tokenizer,
-    limit: int = 5,
-    filters: Optional[Dict[str, Any]] = None,
-) -> list:
-    query_vector = generate_embedding(query_text, model, tokenizer)
+def generate_embedding(text: str, model, tokenizer) -> List[float]:
+    return generate_embeddings([text], model, tokenizer)[0]
+
 
+def _search_pipeline(
+    index_name: str,
+    query_vector: List[float],
+    limit: int,
+    filters: Optional[Dict[str, Any]],
+    include_embedding: bool,
+) -> List[Dict[str, Any]]:
     search_stage: Dict[str, Any] = {
         "$vectorSearch": {
             "index": index_name,
@@ -37,19 +45,94 @@ def vector_search_with_filter(
     if filters:
         search_stage["$vectorSearch"]["filter"] = filters
 
-    pipeline = [
-        search_stage,
-        {
-            "$project": {
-                "_id": 0,
-                "cik": 1,
-                "ticker": 1,
-                "year": 1,
-                "text_chunk": 1,
-                "source": 1,
-                "score": {"$meta": "vectorSearchScore"},
-            }
-        },
+    projection: Dict[str, Any] = {
+        "_id": 0,
+        "cik": 1,
+        "ticker": 1,
+        "year": 1,
+        "text_chunk": 1,
+        "source": 1,
+        "score": {"$meta": "vectorSearchScore"},
+    }
+    if include_embedding:
+        projection["embedding"] = 1
+    return [search_stage, {"$project": projection}]
+
+
+def _decode_embeddings(results: list) -> list:
+    for result in results:
+        result["embedding"] = decode_stored_embedding(result["embedding"])
+    return results
+
+
+def vector_search_by_embedding(
+    collection: Collection,
+    index_name: str,
+    query_vector: List[float],
+    limit: int = 5,
+    filters: Optional[Dict[str, Any]] = None,
+    include_embedding: bool = False,
+) -> list:
+    pipeline = _search_pipeline(index_name, query_vector, limit, filters, include_embedding)
+    results = list(collection.aggregate(pipeline))
+    return _decode_embeddings(results) if include_embedding else results
+
+
+def vector_search_many_by_embedding(
+    collection: Collection,
+    index_name: str,
+    query_vectors: List[List[float]],
+    limit: int = 5,
+    filters: Optional[Dict[str, Any]] = None,
+    include_embedding: bool = False,
+) -> List[list]:
+    """Run one vector search per query vector and return their results in the same order.
+
+    All searches go to Atlas as a single aggregation ($unionWith per extra query), so N queries
+    cost one round trip. Each branch tags its rows with the query's position so the results can
+    be split apart again.
+    """
+    if not query_vectors:
+        return []
+    if len(query_vectors) == 1:
+        return [vector_search_by_embedding(collection, index_name, query_vectors[0], limit, filters, include_embedding)]
+
+    branches = [
+        _search_pipeline(index_name, query_vector, limit, filters, include_embedding)
+        + [{"$addFields": {"_query_index": i}}]
+        for i, query_vector in enumerate(query_vectors)
     ]
+    pipeline = branches[0] + [{"$unionWith": {"coll": collection.name, "pipeline": branch}} for branch in branches[1:]]
+    try:
+        rows = list(collection.aggregate(pipeline))
+    except OperationFailure:
+        # Clusters older than MongoDB 8.0 reject $vectorSearch inside $unionWith; search concurrently instead.
+        with ThreadPoolExecutor(max_workers=len(query_vectors)) as executor:
+            return list(executor.map(
+                lambda query_vector: vector_search_by_embedding(
+                    collection, index_name, query_vector, limit, filters, include_embedding
+                ),
+                query_vectors,
+            ))
+
+    results: List[list] = [[] for _ in query_vectors]
+    for row in rows:
+        results[row.pop("_query_index")].append(row)
+    for query_results in results:
+        query_results.sort(key=lambda row: row["score"], reverse=True)  # Union output order is not guaranteed
+        if include_embedding:
+            _decode_embeddings(query_results)
+    return results
 
-    return list(collection.aggregate(pipeline))
\ No newline at end of file
+
+def vector_search_with_filter(
+    collection: Collection,
+    index_name: str,
+    query_text: str,
+    model,
+    tokenizer,
+    limit: int = 5,
+    filters: Optional[Dict[str, Any]] = None,
+) -> list:
+    query_vector = generate_embedding(query_text, model, tokenizer)
+    return vector_search_by_embedding(collection, index_name, query_vector, limit=limit, filters=filters)
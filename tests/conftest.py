@@ -0,0 +1,10 @@
+# Run with `python -m pytest --rootdir=tests tests` (or from inside tests/): with the repository root as
+# rootdir, pytest imports the root __init__.py, which references a .version module that does not exist.
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The package is imported as sec_analyzer.* from src/, as the scripts and cli.py do; module3 is imported
+# from the repository root, as `python -m module3.rag_service` does.
+sys.path.insert(0, os.path.join(REPO_ROOT, "src"))
+sys.path.append(REPO_ROOT)
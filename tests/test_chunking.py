@@ -0,0 +1,63 @@
+"""Fixture tests for the CSV chunking strategies; expected values are the output of the original row-by-row code."""
+
+import pandas as pd
+
+from sec_analyzer.vector_db.chunking import (
+    process_csv_original_method,
+    process_csv_to_natural_language,
+    process_csv_to_raw_string,
+)
+
+FACTS_CSV = """name,value,unit,decimals,startDate,endDate,instant
+DocumentType,,,,2022-09-25,2023-09-30,
+Assets,352583000000.0,usd,-6,,,2023-09-30
+NetIncomeLoss,96995000000.0,usd,-6,2022-09-25,2023-09-30,
+EarningsPerShareBasic,6.16,usdPerShare,2,2022-09-25,2023-09-30,
+Dash,,,,,,2023-09-30
+Zero,0,usd,0,,2023-09-30,
+"""
+
+
+def _facts_csv(tmp_path):
+    path = tmp_path / "facts.csv"
+    path.write_text(FACTS_CSV, encoding="utf-8")
+    return str(path)
+
+
+def test_natural_language_chunks(tmp_path):
+    assert process_csv_to_natural_language(_facts_csv(tmp_path)) == [
+        "For a financial record, the metric is 'DocumentType', as of 2023-09-30.",
+        "For a financial record, the metric is 'Assets', its value is 352583000000.0, with unit 'usd'.",
+        "For a financial record, the metric is 'NetIncomeLoss', its value is 96995000000.0, with unit 'usd', as of 2023-09-30.",
+        "For a financial record, the metric is 'EarningsPerShareBasic', its value is 6.16, with unit 'usdPerShare', as of 2023-09-30.",
+        "For a financial record, the metric is 'Zero', its value is 0, with unit 'usd', as of 2023-09-30.",
+    ]
+
+
+def test_raw_string_chunks(tmp_path):
+    assert process_csv_to_raw_string(_facts_csv(tmp_path)) == [
+        "DocumentType    2022-09-25 2023-09-30 ",
+        "Assets 352583000000.0 usd -6   2023-09-30",
+        "NetIncomeLoss 96995000000.0 usd -6 2022-09-25 2023-09-30 ",
+        "EarningsPerShareBasic 6.16 usdPerShare 2 2022-09-25 2023-09-30 ",
+        "Dash      2023-09-30",
+        "Zero 0 usd 0  2023-09-30 ",
+    ]
+
+
+def test_original_method_chunks(tmp_path):
+    assert process_csv_original_method(_facts_csv(tmp_path), chunk_size=60, overlap=10) == [
+        "DocumentType    2022-09-25 2023-09-30  Assets 352583000000.0",
+        "83000000.0 usd -6   2023-09-30 NetIncomeLoss 96995000000.0 u",
+        "000000.0 usd -6 2022-09-25 2023-09-30  EarningsPerShareBasic",
+        "ShareBasic 6.16 usdPerShare 2 2022-09-25 2023-09-30  Dash   ",
+        "0  Dash      2023-09-30 Zero 0 usd 0  2023-09-30 ",
+    ]
+
+
+def test_strategies_accept_a_loaded_frame(tmp_path):
+    path = _facts_csv(tmp_path)
+    df = pd.read_csv(path, keep_default_na=False)
+
+    assert process_csv_to_natural_language(df) == process_csv_to_natural_language(path)
+    assert process_csv_to_raw_string(df) == process_csv_to_raw_string(path)
@@ -0,0 +1,25 @@
+import contextlib
+import io
+import time
+
+from module3.cli import spinner
+
+
+def _terminal_lines(raw):
+    # What a terminal shows: on each line, only the text after the last carriage return survives
+    return [line.rsplit("\r", 1)[-1] for line in raw.split("\n")]
+
+
+def test_spinner_keeps_prints_from_the_block_intact():
+    stream = io.StringIO()
+    with contextlib.redirect_stdout(stream):
+        with spinner("Thinking..."):
+            time.sleep(0.15)
+            print("Question: revenue?")
+            print("partial", end="")
+            time.sleep(0.15)  # The spinner must not draw over an unfinished line
+            print(" line")
+            time.sleep(0.15)
+        print("answer")
+
+    assert _terminal_lines(stream.getvalue()) == ["Question: revenue?", "partial line", "answer", ""]
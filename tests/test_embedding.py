@@ -0,0 +1,56 @@
+from pymongo.errors import OperationFailure
+
+from sec_analyzer.vector_db import embedding
+from sec_analyzer.vector_db.embedding import CONTENT_HASH_INDEX_NAME, _ensure_content_hash_index
+
+
+class _IndexedCollection:
+    """Just enough of a pymongo Collection to follow the server's rules for indexes on one key."""
+
+    def __init__(self, full_name, indexes):
+        self.full_name = full_name
+        self.indexes = dict(indexes)
+        self.calls = []
+
+    def index_information(self):
+        self.calls.append("index_information")
+        return {name: dict(info) for name, info in self.indexes.items()}
+
+    def create_index(self, key, name, **options):
+        self.calls.append(("create_index", name))
+        for existing_name, info in self.indexes.items():
+            if info["key"] == [(key, 1)] and existing_name != name:
+                raise OperationFailure("Index already exists with a different name", code=85)
+        self.indexes[name] = {"key": [(key, 1)], **options}
+
+    def drop_index(self, name):
+        self.calls.append(("drop_index", name))
+        del self.indexes[name]
+
+
+def _reset_indexed_collections(monkeypatch):
+    monkeypatch.setattr(embedding, "_INDEXED_COLLECTIONS", set())
+
+
+def test_replaces_plain_content_hash_index(monkeypatch):
+    _reset_indexed_collections(monkeypatch)
+    collection = _IndexedCollection("db.chunks", {
+        "_id_": {"key": [("_id", 1)]},
+        "content_hash_1": {"key": [("content_hash", 1)]},
+    })
+
+    _ensure_content_hash_index(collection)
+
+    assert set(collection.indexes) == {"_id_", CONTENT_HASH_INDEX_NAME}
+    assert collection.indexes[CONTENT_HASH_INDEX_NAME]["unique"] is True
+    assert collection.indexes[CONTENT_HASH_INDEX_NAME]["partialFilterExpression"] == {"content_hash": {"$type": "string"}}
+
+
+def test_ensures_index_once_per_collection(monkeypatch):
+    _reset_indexed_collections(monkeypatch)
+    collection = _IndexedCollection("db.chunks", {"_id_": {"key": [("_id", 1)]}})
+
+    for _ in range(3):
+        _ensure_content_hash_index(collection)
+
+    assert collection.calls == ["index_information", ("create_index", CONTENT_HASH_INDEX_NAME)]
@@ -0,0 +1,202 @@
+"""Fixture tests for FilingsExtractor's XBRL and HTML table parsing."""
+
+import pandas as pd
+
+from sec_analyzer.scraper.extractor import FilingsExtractor
+
+STATEMENT_HTML = """<html><body>
+<p>Intro text</p>
+<table>
+<tr><td>Navigation</td><td>Links</td></tr>
+</table>
+<table>
+<tr><td>CONSOLIDATED STATEMENTS OF OPERATIONS</td><td></td></tr>
+<tr><td>Net sales</td><td>$</td><td>383285</td></tr>
+<tr><td>Net income</td><td>$</td><td>96995</td></tr>
+</table>
+</body></html>
+"""
+
+
+def _write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def test_parse_html_returns_financial_tables(tmp_path):
+    df = FilingsExtractor()._parse_html(_write(tmp_path, "filing.htm", STATEMENT_HTML))
+
+    assert isinstance(df, pd.DataFrame)
+    assert len(df) == 2  # Header row promoted; the navigation table is skipped
+    assert "Net sales" in df.iloc[:, 0].tolist()
+
+
+# A typical SEC statement layout: year headers span the "$" and amount columns.
+SPANNED_STATEMENT_HTML = """<html><body><table>
+<tr><td></td><td colspan="2">2023</td><td colspan="2">2022</td></tr>
+<tr><td>CONSOLIDATED STATEMENTS OF OPERATIONS</td><td></td><td></td><td></td><td></td></tr>
+<tr><td>Net sales</td><td>$</td><td>383,285</td><td>$</td><td>394,328</td></tr>
+<tr><td>Net income</td><td>$</td><td>96,995</td><td>$</td><td>99,803</td></tr>
+<tr><td>Shares (in thousands)</td><td></td><td>15,744,231</td><td></td><td>16,215,963</td></tr>
+</table></body></html>
+"""
+
+
+def test_parse_html_matches_read_html_layout(tmp_path):
+    # Expected output is what pd.read_html(flavor="bs4") produced for this table before the lxml rewrite.
+    df = FilingsExtractor()._parse_html(_write(tmp_path, "filing.htm", SPANNED_STATEMENT_HTML))
+
+    assert df.to_csv(index=False) == (
+        ",2023,2023.0,2022,2022.0\n"
+        "CONSOLIDATED STATEMENTS OF OPERATIONS,,,,\n"
+        "Net sales,$,383285.0,$,394328.0\n"
+        "Net income,$,96995.0,$,99803.0\n"
+        "Shares (in thousands),,15744231.0,,16215963.0\n"
+    )
+    assert df.iloc[1, 2] == 383285
+
+
+ROWSPAN_HIDDEN_HTML = """<html><body>
+<table>
+<thead><tr><th>Item</th><th>2023</th><th>2022</th></tr></thead>
+<tbody><tr><td>Total assets</td><td>$352,583</td><td>$352,755</td></tr>
+<tr><td rowspan="2">Liabilities</td><td>290,437</td><td>302,083</td></tr>
+<tr><td>1,000</td><td>2,000</td></tr></tbody>
+</table>
+<table id="balance sheet">
+<tr><th>Metric</th><th>Value</th></tr>
+<tr><td>Cash   and
+ equivalents</td><td>29,965</td></tr>
+<tr><td>Hidden<span style="display: none">SECRET</span> row</td><td>N/A</td></tr>
+</table>
+<table style="display:none"><tr><td>$ hidden table</td></tr></table>
+</body></html>
+"""
+
+
+def test_parse_html_rowspan_thead_and_hidden_cells(tmp_path):
+    df = FilingsExtractor()._parse_html(_write(tmp_path, "filing.htm", ROWSPAN_HIDDEN_HTML))
+
+    # Same rows and values pd.read_html(flavor="bs4") gave: rowspan copied down, hidden text dropped,
+    # whitespace runs collapsed, the hidden table ignored, then the first data row promoted to header.
+    assert df.to_csv(index=False) == (
+        "Total assets,\"$352,583\",\"$352,755\",Cash and  equivalents,29965.0\n"
+        "Liabilities,290437,302083,,\n"
+        "Liabilities,1000,2000,,\n"
+        ",,,Hidden row,\n"
+    )
+
+
+# Line breaks inside header and label cells, as SEC statements use them.
+LINE_BREAK_HTML = """<html><body><table>
+<tr><td></td><td colspan="2">Year Ended<br>September 30, 2023</td><td colspan="2">Year Ended<br/>September 24,<br> 2022</td></tr>
+<tr><td>CONSOLIDATED STATEMENTS OF CASH FLOWS</td><td></td><td></td><td></td><td></td></tr>
+<tr><td>Cash<br/>flow</td><td>$</td><td>110,543</td><td>$</td><td>122,151</td></tr>
+<tr><td>Net<br><b>income</b></td><td>$</td><td>96,995</td><td>$</td><td>99,803</td></tr>
+</table></body></html>
+"""
+
+
+def test_parse_html_line_breaks_separate_words(tmp_path):
+    df = FilingsExtractor()._parse_html(_write(tmp_path, "filing.htm", LINE_BREAK_HTML))
+
+    # pd.read_html turns each <br> into a newline, which the whitespace collapsing makes a space
+    assert df.to_csv(index=False) == (
+        ',"Year Ended September 30, 2023","Year Ended September 30, 2023",'
+        '"Year Ended September 24,  2022","Year Ended September 24,  2022"\n'
+        "CONSOLIDATED STATEMENTS OF CASH FLOWS,,,,\n"
+        "Cash flow,$,110543,$,122151\n"
+        "Net income,$,96995,$,99803\n"
+    )
+
+
+# Tables whose headers come out blank (NaN), as integer positions, or as numeric-looking text.
+MIXED_HEADER_TABLES_HTML = """<html><body>
+<table>
+<tr><td></td><td>2023</td><td>2022</td></tr>
+<tr><td>CONSOLIDATED BALANCE SHEETS</td><td></td><td></td></tr>
+<tr><td>Total assets</td><td>$352,583</td><td>$352,755</td></tr>
+</table>
+<table>
+<tr><td>$</td><td>1</td></tr>
+<tr><td>$</td><td>1</td></tr>
+</table>
+<table>
+<tr><td>Consolidated</td><td>0</td></tr>
+<tr><td>Cash</td><td>n/a</td></tr>
+</table>
+</body></html>
+"""
+
+
+def test_parse_html_concatenates_tables_like_pandas(tmp_path):
+    df = FilingsExtractor()._parse_html(_write(tmp_path, "filing.htm", MIXED_HEADER_TABLES_HTML))
+
+    # pd.concat aligns on the labels as they are; none are converted to strings
+    assert [str(column) for column in df.columns] == ["nan", "2023", "2022", "0", "1", "Consolidated"]
+    assert df.to_csv(index=False) == (
+        ",2023,2022,0,1,Consolidated\n"
+        "CONSOLIDATED BALANCE SHEETS,,,,,\n"
+        'Total assets,"$352,583","$352,755",,,\n'
+        ",,,$,1.0,\n"
+        ",,,$,1.0,\n"
+        ",,,,,Cash\n"
+    )
+
+
+def test_save_to_csv_keeps_pandas_number_formatting(tmp_path):
+    # The CSV text becomes the ingested chunks (and their content hashes), so it must not change format.
+    df = pd.DataFrame({
+        "name": ["Assets", "EarningsPerShareBasic"],
+        "value": [352583000000.0, 6.16],
+        "unit": ["usd", "usdPerShare"],
+    })
+    FilingsExtractor().save_to_csv("AAPL", {"0000320193-23-000106": df}, output_dir=tmp_path)
+
+    assert (tmp_path / "AAPL" / "0000320193-23-000106.csv").read_text() == (
+        "name,value,unit\n"
+        "Assets,352583000000.0,usd\n"
+        "EarningsPerShareBasic,6.16,usdPerShare\n"
+    )
+
+
+# Covers: a duration and an instant context, a fact before its context is defined, thousands separators,
+# a non-numeric value and a fact without a unit.
+XBRL_INSTANCE = """<?xml version="1.0" encoding="utf-8"?>
+<xbrli:xbrl xmlns:xbrli="http://www.xbrl.org/2003/instance" xmlns:us-gaap="http://fasb.org/us-gaap/2023" xmlns:dei="http://xbrl.sec.gov/dei/2023" xmlns:link="http://www.xbrl.org/2003/linkbase" xmlns:xlink="http://www.w3.org/1999/xlink" xmlns:iso4217="http://www.xbrl.org/2003/iso4217">
+  <link:schemaRef xlink:type="simple" xlink:href="aapl-20230930.xsd"/>
+  <xbrli:context id="FY2023">
+    <xbrli:entity><xbrli:identifier scheme="http://www.sec.gov/CIK">0000320193</xbrli:identifier></xbrli:entity>
+    <xbrli:period><xbrli:startDate>2022-09-25</xbrli:startDate><xbrli:endDate>2023-09-30</xbrli:endDate></xbrli:period>
+  </xbrli:context>
+  <xbrli:context id="I2023">
+    <xbrli:entity><xbrli:identifier scheme="http://www.sec.gov/CIK">0000320193</xbrli:identifier></xbrli:entity>
+    <xbrli:period><xbrli:instant>2023-09-30</xbrli:instant></xbrli:period>
+  </xbrli:context>
+  <xbrli:unit id="usd"><xbrli:measure>iso4217:USD</xbrli:measure></xbrli:unit>
+  <dei:DocumentType contextRef="FY2023">10-K</dei:DocumentType>
+  <us-gaap:Assets contextRef="I2023" unitRef="usd" decimals="-6">352583000000</us-gaap:Assets>
+  <us-gaap:NetIncomeLoss contextRef="FY2023" unitRef="usd" decimals="-6">96995000000</us-gaap:NetIncomeLoss>
+  <us-gaap:EarningsPerShareBasic contextRef="FY2023" unitRef="usdPerShare" decimals="2">6.16</us-gaap:EarningsPerShareBasic>
+  <us-gaap:CommonStockSharesOutstanding contextRef="I2023" unitRef="shares" decimals="INF">15,550,061,000</us-gaap:CommonStockSharesOutstanding>
+  <us-gaap:Dash contextRef="I2023">-</us-gaap:Dash>
+  <us-gaap:Later contextRef="LATE" unitRef="usd" decimals="0">42</us-gaap:Later>
+  <xbrli:context id="LATE"><xbrli:entity><xbrli:identifier scheme="x">1</xbrli:identifier></xbrli:entity><xbrli:period><xbrli:instant>2021-01-01</xbrli:instant></xbrli:period></xbrli:context>
+</xbrli:xbrl>
+"""
+
+
+def test_parse_xbrl_matches_baseline_output(tmp_path):
+    df = FilingsExtractor()._parse_xbrl(_write(tmp_path, "aapl-20230930_htm.xml", XBRL_INSTANCE))
+
+    assert df.to_csv(index=False) == (
+        "name,value,unit,decimals,startDate,endDate,instant\n"
+        "DocumentType,,,,2022-09-25,2023-09-30,\n"
+        "Assets,352583000000.0,usd,-6,,,2023-09-30\n"
+        "NetIncomeLoss,96995000000.0,usd,-6,2022-09-25,2023-09-30,\n"
+        "EarningsPerShareBasic,6.16,usdPerShare,2,2022-09-25,2023-09-30,\n"
+        "CommonStockSharesOutstanding,15550061000.0,shares,INF,,,2023-09-30\n"
+        "Dash,,,,,,2023-09-30\n"
+        "Later,42.0,usd,0,,,2021-01-01\n"
+    )
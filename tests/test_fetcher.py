@@ -0,0 +1,48 @@
+from sec_analyzer.scraper.fetcher import FilingsFetcher
+
+METADATA = {
+    "filings": {
+        "recent": {
+            "accessionNumber": ["0000320193-23-000106", "0000320193-23-000077", "0000320193-22-000108"],
+            "form": ["10-K", "10-Q", "10-K"],
+            "reportDate": ["2023-09-30", "2023-07-01", "2022-09-24"],
+        }
+    }
+}
+
+
+def test_accession_numbers_filtered_by_year():
+    fetcher = FilingsFetcher()
+
+    assert fetcher._get_accession_numbers(METADATA, [2022], 4) == [("0000320193-22-000108", "000032019322000108")]
+    assert fetcher._get_accession_numbers(METADATA, None, 4) == [
+        ("0000320193-23-000106", "000032019323000106"),
+        ("0000320193-22-000108", "000032019322000108"),
+    ]
+    # As before, an empty years list matches nothing rather than every year
+    assert fetcher._get_accession_numbers(METADATA, [], 4) == []
+
+
+def test_wanted_files_skip_ignored_keywords_and_rendered_reports():
+    fetcher = FilingsFetcher()
+    manifest_names = [
+        "aapl-20230930.htm",
+        "aapl-20230930_htm.xml",
+        "aapl-20230930.xsd",
+        "0000320193-23-000106.txt",
+        "0000320193-23-000106-index.htm",
+        "0000320193-23-000106-index-headers.htm",
+        "FilingSummary.xml",
+        "R2.htm",
+        "xslForm10K_X01/primary_doc.htm",
+        "form.xsd",
+        "Financial_Report.xlsx",
+        "report.js",
+    ]
+
+    assert [name for name in manifest_names if fetcher._is_wanted_file(name)] == [
+        "aapl-20230930.htm",
+        "aapl-20230930_htm.xml",
+        "aapl-20230930.xsd",
+        "0000320193-23-000106.txt",
+    ]
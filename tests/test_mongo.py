@@ -0,0 +1,11 @@
+import warnings
+
+from pymongo import MongoClient
+
+from sec_analyzer.vector_db.mongo import MONGO_CLIENT_OPTIONS
+
+
+def test_client_options_need_no_optional_packages():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # pymongo warns when a listed compressor's package is missing
+        MongoClient("mongodb://localhost", connect=False, **MONGO_CLIENT_OPTIONS).close()
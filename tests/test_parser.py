@@ -0,0 +1,104 @@
+"""Fixture tests for FilingParser's section extraction."""
+
+from pathlib import Path
+
+import ujson
+
+from sec_analyzer.scraper.parser import FilingParser
+
+# UTF-8 punctuation in headings and body text, with no declared charset (as in most EDGAR documents).
+FILING_HTML = """<html><body>
+<p>Table of Contents</p>
+<p>Item 1A – Risk Factors</p>
+<p>Our café business faces “risks”.</p>
+<p>Item 1B. Unresolved Staff Comments</p>
+<p>Item 8 – Financial Statements and Supplementary Data</p>
+<p>CONSOLIDATED STATEMENTS OF OPERATIONS</p>
+<table><tr><td>Net sales</td><td>$ 383,285</td></tr></table>
+<p>CONSOLIDATED BALANCE SHEETS</p><!-- comment -->
+<script>var x = 1;</script>
+<p>Notes to Consolidated Financial Statements</p>
+<p>Item 9. Changes in and Disagreements</p>
+</body></html>
+"""
+
+
+def _write(tmp_path, content):
+    path = tmp_path / "filing.htm"
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def test_parse_section_with_non_ascii_heading(tmp_path):
+    section = FilingParser().parse_section(_write(tmp_path, FILING_HTML))
+
+    assert section == (
+        "Item 8 – Financial Statements and Supplementary Data\n"
+        "CONSOLIDATED STATEMENTS OF OPERATIONS\n"
+        "Net sales\n"
+        "$ 383,285\n"
+        "CONSOLIDATED BALANCE SHEETS\n"
+        "Notes to Consolidated Financial Statements"
+    )
+
+
+def test_parse_risk_factors_decodes_utf8(tmp_path):
+    risk_factors = FilingParser().parse_risk_factors(_write(tmp_path, FILING_HTML))
+
+    assert risk_factors == "Item 1A – Risk Factors\nOur café business faces “risks”."
+
+
+# Scripts, styles and comments mentioning later items, inline markup splitting a sentence, and an
+# Item 1B heading ending the risk factors before Item 2 does.
+SECTIONED_FILING_HTML = """<html><head><title>10-K</title><style>p { color: red }</style></head><body>
+<div>Table of Contents</div>
+<p>ITEM 1A. RISK FACTORS</p>
+<p>The Company's business can be affected by <b>macroeconomic</b> conditions.</p>
+<script>var x = "ITEM 1B";</script>
+<p>   Supply chain   risk.</p>
+<p>Item 1B. Unresolved Staff Comments</p>
+<p>None.</p>
+<p>Item 2. Properties</p>
+<p>ITEM 8. FINANCIAL STATEMENTS AND SUPPLEMENTARY DATA</p>
+<!-- ITEM 9 comment -->
+<p>CONSOLIDATED STATEMENTS OF OPERATIONS</p>
+<table><tr><td>Net sales</td><td>$</td><td>383,285</td></tr></table>
+<p>Notes to Consolidated Financial Statements</p>
+<p>Note 1 &amp; summary</p>
+<p>Item 9. Changes in and Disagreements with Accountants</p>
+<p>None.</p>
+</body></html>
+"""
+
+
+def test_sections_match_baseline_output(tmp_path):
+    parser = FilingParser()
+    path = _write(tmp_path, SECTIONED_FILING_HTML)
+
+    assert parser.parse_section(path) == (
+        "ITEM 8. FINANCIAL STATEMENTS AND SUPPLEMENTARY DATA\n"
+        "CONSOLIDATED STATEMENTS OF OPERATIONS\n"
+        "Net sales\n$\n383,285\n"
+        "Notes to Consolidated Financial Statements\n"
+        "Note 1 & summary"
+    )
+    assert parser.parse_risk_factors(path) == (
+        "ITEM 1A. RISK FACTORS\n"
+        "The Company's business can be affected by\nmacroeconomic\nconditions.\n"
+        "Supply chain   risk."
+    )
+
+
+def test_parse_all_filings_in_worker_processes(tmp_path):
+    filings = tmp_path / "AAPL"
+    for name in ("a.htm", "b.htm"):
+        (filings / name.split(".")[0]).mkdir(parents=True)
+        (filings / name.split(".")[0] / name).write_text(SECTIONED_FILING_HTML, encoding="utf-8")
+    output_file = tmp_path / "risk_factors.json"
+
+    # Two files, so they are parsed in a process pool (started without fork)
+    FilingParser(max_workers=2).parse_risk_factors_all_filings(filings, output_file)
+
+    parsed = ujson.loads(output_file.read_text(encoding="utf-8"))
+    assert [Path(item["file"]).name for item in parsed] == ["a.htm", "b.htm"]
+    assert all(item["risk_factors"].startswith("ITEM 1A. RISK FACTORS") for item in parsed)
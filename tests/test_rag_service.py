@@ -0,0 +1,26 @@
+import numpy as np
+from langchain_core.documents import Document
+
+from module3.rag_service import SECRAGService
+
+
+def _doc(text, source, embedding):
+    embedding = np.asarray(embedding, dtype=np.float32)
+    return Document(page_content=text, metadata={"source": source, "embedding": embedding / np.linalg.norm(embedding)})
+
+
+def test_drop_near_duplicates_keeps_facts_from_one_filing():
+    # The same line item for two fiscal years embeds almost identically
+    docs = [
+        _doc("NetIncomeLoss 96995000000 2023", "AAPL_2023.csv", [1.0, 0.01, 0.0]),
+        _doc("NetIncomeLoss 99803000000 2022", "AAPL_2023.csv", [1.0, 0.0, 0.01]),
+        _doc("NetIncomeLoss 99803000000 2022", "AAPL_2022.csv", [1.0, 0.0, 0.011]),
+        _doc("Risk factors", "AAPL_2022.csv", [0.0, 1.0, 0.0]),
+    ]
+
+    kept = SECRAGService._drop_near_duplicates(docs, limit=4)
+
+    assert [doc.page_content for doc in kept] == [
+        "NetIncomeLoss 96995000000 2023", "NetIncomeLoss 99803000000 2022", "Risk factors",
+    ]
+    assert kept[1].metadata["source"] == "AAPL_2023.csv"
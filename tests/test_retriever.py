@@ -0,0 +1,77 @@
+"""Tests for the module3 retriever and its caches."""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+from pymongo import MongoClient
+
+import module3.SECRetriever as SECRetriever_module
+from module3.query_cache import QueryCache
+from module3.SECRetriever import SECRetriever
+from module3.similarity_cache import SimilarityCache, query_entities
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_module3_imports_one_copy_of_the_package():
+    # module3 imports the package as src.sec_analyzer; nothing it pulls in may also load it as sec_analyzer,
+    # or the Mongo client registry and the model cache would exist twice.
+    code = (
+        "import sys\n"
+        "import module3.rag_service\n"
+        "print(sorted(name for name in sys.modules if name.startswith('sec_analyzer')))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": REPO_ROOT},
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
+
+def _unit_vector(dim=8):
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[0] = 1.0
+    return vector.tolist()
+
+
+def test_similarity_cache_keeps_years_and_companies_apart():
+    cache = SimilarityCache()
+    context = QueryCache.make_context_key(None, 5)
+    vector = _unit_vector()  # Worst case: the embeddings are identical
+    cache.put((context, query_entities("What was Apple's revenue in 2022?")), vector, ["apple 2022"])
+
+    assert cache.get((context, query_entities("What was Apple's revenue in 2023?")), vector) is None
+    assert cache.get((context, query_entities("What was Microsoft's revenue in 2022?")), vector) is None
+    assert cache.get((context, query_entities("Apple revenue in 2022")), vector) == ["apple 2022"]
+
+
+def test_retriever_searches_queries_that_differ_by_year(monkeypatch):
+    searched = []
+
+    def fake_search(collection, index_name, query_vectors, limit, filters, include_embedding):
+        searched.extend(query_vectors)
+        return [[{"text_chunk": f"result {len(searched)}"}] for _ in query_vectors]
+
+    monkeypatch.setattr(SECRetriever_module, "vector_search_many_by_embedding", fake_search)
+    queries = ["Apple net income 2022", "Apple net income 2023"]
+    retriever = SECRetriever(
+        collection=MongoClient(connect=False)["db"]["chunks"], search_index_name="vector_index",
+        model=None, tokenizer=None, similarity_cache=SimilarityCache(),
+        precomputed_embeddings={query: _unit_vector() for query in queries},
+    )
+
+    first, second = (retriever.invoke(query) for query in queries)
+
+    assert len(searched) == 2
+    assert first[0].page_content != second[0].page_content
+
+
+def test_retriever_has_no_similarity_cache_by_default():
+    retriever = SECRetriever(
+        collection=MongoClient(connect=False)["db"]["chunks"], search_index_name="vector_index",
+        model=None, tokenizer=None,
+    )
+    assert retriever.similarity_cache is None
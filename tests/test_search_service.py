@@ -0,0 +1,12 @@
+from sec_analyzer.vector_db.search_service import vector_search_many_by_embedding
+
+
+class _UnusedCollection:
+    name = "embedded_chunks"
+
+    def aggregate(self, pipeline):
+        raise AssertionError("no query vectors, so nothing should be sent to the server")
+
+
+def test_search_many_without_queries_returns_no_results():
+    assert vector_search_many_by_embedding(_UnusedCollection(), "vector_index", []) == []